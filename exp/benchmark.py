@@ -0,0 +1,310 @@
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from loguru import logger
+
+EXP_DIR = Path(__file__).parent
+sys.path.append(EXP_DIR.parent.as_posix())
+
+
+def loadOperations(swagger: Path):
+    from src.openapiParser import Parser
+
+    os.environ["swagger"] = swagger.as_posix()
+    parser = Parser(logger)
+    parser.parse()
+    return parser.operations
+
+
+def legacyActsConstraints(domain_map, paramNames, constraints) -> List[str]:
+    """the string rewriting done before constraints were compiled, kept as the baseline"""
+    actsConstraints = list()
+    for c in constraints:
+        formattedStr = c._template
+        for matcher in re.finditer(r"(\w)\1\s*(!?=?=)\s*[\'\"]?(None|(\w)\4)[\'\"]?", c._template):
+            if matcher.group(3) == "None":
+                paramName, op, value = c.ents[ord(matcher.group(1)) - 65], matcher.group(2), None
+            else:
+                paramName, op, value = c.ents[ord(matcher.group(1)) - 65], matcher.group(2), c.ents[
+                    ord(matcher.group(4)) - 65]
+            try:
+                valueList = [v.val for v in domain_map.get(paramName)]
+                valueIndex = valueList.index(value)
+            except (ValueError, TypeError):
+                formattedStr = None
+                break
+            formattedStr = re.sub(matcher.group(), "{} {} {}".format(paramName, op, valueIndex), formattedStr)
+        if formattedStr is None:
+            continue
+        for paramName in c.paramNames:
+            formattedStr = re.sub(re.compile(r"\b" + paramName + r"\b"), "P" + str(paramNames.index(paramName)),
+                                  formattedStr)
+        actsConstraints.extend(eval(formattedStr))
+    return actsConstraints
+
+
+def legacySetParamValue(operation, case):
+    """Executor.setParamValue before rows were read directly: the row was copied onto the parameter tree"""
+    for p in operation.parameterList:
+        p.value = p.getValueDto(case)
+
+
+def legacyPrintableValue(param, responses):
+    """printableValue before the parameter tree was walked once per row: objects evaluated every child twice"""
+    from src.Dto.parameter import ObjectParam, ArrayParam
+
+    if isinstance(param, ObjectParam):
+        value = dict()
+        for child in param._children:
+            childValue = legacyPrintableValue(child, responses)
+            if childValue is not None:
+                value[child.name] = legacyPrintableValue(child, responses)
+        return None if len(value.keys()) == 0 else value
+    if isinstance(param, ArrayParam):
+        value = legacyPrintableValue(param._item, responses)
+        return None if value is None else [value]
+    # without a row, the value set by legacySetParamValue is read
+    return param.printableValue(responses)
+
+
+def legacyAssemble(operation, responses, case) -> dict:
+    """
+    the assembly done before operations were compiled into request templates
+    and bodies were serialized in one pass, kept as the baseline: the row is set on the parameters first
+    """
+    from src.Dto.keywords import Loc, DataType
+
+    url = operation.url
+    headers = {
+        'Content-Type': operation.header[0] if operation.header is not None else "applications/json",
+        'user-agent': 'my-app/0.0.1'
+    }
+    params = dict()
+    files = dict()
+    formData = dict()
+    body = dict()
+
+    legacySetParamValue(operation, case)
+    for p in operation.parameterList:
+        value = legacyPrintableValue(p, responses)
+        if value is None:
+            if p.loc is Loc.Path:
+                url = url.replace("{" + p.name + "}", str("abc"))
+        else:
+            if p.type is DataType.File:
+                files = value
+            elif p.loc is Loc.Path:
+                url = url.replace("{" + p.name + "}", str(value))
+            elif p.loc is Loc.Query:
+                params[p.name] = value
+            elif p.loc is Loc.Header:
+                headers[p.name] = value
+            elif p.loc is Loc.FormData:
+                if isinstance(value, dict):
+                    formData.update(value)
+                else:
+                    formData[p.name] = value
+            elif p.loc is Loc.Body:
+                if isinstance(value, dict):
+                    body.update(value)
+                else:
+                    body[p.name] = value
+            else:
+                raise Exception("unexpected Param Loc Type: {}".format(p.name))
+
+    kwargs = dict()
+    kwargs["url"] = url
+    kwargs["headers"] = headers
+    if len(params) > 0:
+        kwargs["params"] = params
+    if len(files) > 0:
+        kwargs["files"] = files
+    if len(formData) > 0:
+        kwargs["data"] = formData
+    if len(body) > 0:
+        kwargs["data"] = json.dumps(body)
+    return kwargs
+
+
+def legacyIsValid(permutation) -> bool:
+    """SemanticValidator.is_valid before paths were indexed: every check compared the elements of two paths"""
+    from src.Dto.keywords import Method
+
+    for index, operation in enumerate(permutation):
+        if operation.method is Method.POST and any(operation.path.is_ancestor_of(pre.path)
+                                                   for pre in permutation[:index]):
+            return False
+        elif operation.method is Method.DELETE and any(operation.path.is_ancestor_of(aft.path)
+                                                       for aft in permutation[index + 1:]):
+            return False
+    return True
+
+
+def legacyCandidates(operations, seq) -> set:
+    """SCA._get_candidates before paths were indexed"""
+    from src.Dto.keywords import Method
+
+    return {op for op in operations if op not in seq and not any(
+        member.method is Method.DELETE and member.path.is_ancestor_of(op.path) for member in seq)}
+
+
+def legacyDependentOps(operations, op, seq) -> list:
+    """SCA._retrieve_dependent_ops before paths were indexed"""
+    from src.Dto.keywords import Method
+
+    result = [c for c in operations if c not in seq and c != op and
+              c.method is Method.POST and c.path.is_ancestor_of(op.path)]
+    return sorted(result, key=lambda o: len(o.path.elements)) + [op]
+
+
+def paths(settings):
+    """time the semantic checks of operation sequences, on every prefix of the sequences generated for a swagger"""
+    from src.Dto.operation import PathTrie
+    from src.sca import SCA, SemanticValidator
+    from src.statistics import Statistics
+
+    random.seed(settings.seed)
+    operations = loadOperations(Path(settings.swagger))
+    start = time.perf_counter()
+    PathTrie(operations)
+    print("{} operations, paths indexed in {:.1f}us".format(len(operations), (time.perf_counter() - start) * 1e6))
+
+    stat = Statistics(argparse.Namespace(columnId="", s_strength=settings.strength, e_strength=3, a_strength=2,
+                                         budget=1, interval=1, output_folder=""))
+    sca = SCA(settings.strength, operations, stat)
+    sequences = list()
+    while not sca.is_all_covered():
+        sequences.append(sca.build_one_sequence())
+    prefixes = [seq[:i] for seq in sequences for i in range(len(seq) + 1)]
+
+    checks = [
+        ("is_valid", lambda s: legacyIsValid(s), lambda s: SemanticValidator.is_valid(s)),
+        ("candidates", lambda s: legacyCandidates(operations, s), lambda s: sca._get_candidates(s)),
+        ("dependent", lambda s: [legacyDependentOps(operations, op, s) for op in operations if op not in s],
+         lambda s: [sca._retrieve_dependent_ops(op, s) for op in operations if op not in s]),
+    ]
+    print("{:<12}{:>9}{:>13}{:>13}{:>9}".format("check", "calls", "legacy(us)", "indexed(us)", "speedup"))
+    for name, legacy, indexed in checks:
+        for s in prefixes:
+            if legacy(s) != indexed(s):
+                raise Exception("{} differs on {}".format(name, s))
+        start = time.perf_counter()
+        for s in prefixes:
+            legacy(s)
+        legacyTime = (time.perf_counter() - start) / len(prefixes) * 1e6
+        start = time.perf_counter()
+        for s in prefixes:
+            indexed(s)
+        indexedTime = (time.perf_counter() - start) / len(prefixes) * 1e6
+        print("{:<12}{:>9}{:>13.1f}{:>13.1f}{:>9}".format(
+            name, len(prefixes), legacyTime, indexedTime,
+            "{:.1f}x".format(legacyTime / indexedTime) if indexedTime > 0 else "-"))
+
+
+def assemble(settings):
+    """time the assembly of requests from random rows of every operation, bodies included"""
+    from src.ca import Executor
+
+    random.seed(settings.seed)
+    print("{:<12}{:>6}{:>8}{:>13}{:>13}{:>9}".format("api", "ops", "rows", "legacy(us)", "compiled(us)", "speedup"))
+    for swagger in sorted(Path(settings.swaggerDir).glob("*.json")):
+        operations = loadOperations(swagger)
+        total, legacyTime, compiledTime = 0, 0.0, 0.0
+        for operation in operations:
+            domain_map = dict()
+            for root in operation.parameterList:
+                for p in root.genDomain(operation.__repr__(), dict(), dict()):
+                    domain_map[p.getGlobalName()] = p.domain
+            rows = [{name: random.choice(domain) for name, domain in domain_map.items() if len(domain) > 0}
+                    for _ in range(settings.rows)]
+            total += len(rows)
+
+            start = time.perf_counter()
+            for row in rows:
+                legacyAssemble(operation, dict(), row)
+            legacyTime += time.perf_counter() - start
+
+            start = time.perf_counter()
+            for row in rows:
+                Executor.assemble(operation, dict(), row)
+            compiledTime += time.perf_counter() - start
+
+        legacyTime, compiledTime = legacyTime / max(total, 1) * 1e6, compiledTime / max(total, 1) * 1e6
+        print("{:<12}{:>6}{:>8}{:>13.2f}{:>13.2f}{:>9}".format(
+            swagger.stem, len(operations), total, legacyTime, compiledTime,
+            "{:.1f}x".format(legacyTime / compiledTime) if compiledTime > 0 else "-"))
+
+
+def constraints(settings):
+    """time the translation of constraints into acts input, once per covering array of every operation"""
+    from src.Dto.constraint import Processor
+    from src.ca import ACTS
+
+    os.environ["patternFile"] = (EXP_DIR.parent / "lib/matchrules.json").as_posix()
+    print("{:<12}{:>6}{:>13}{:>13}{:>13}{:>9}".format("api", "ops", "constraints", "legacy(us)", "compiled(us)",
+                                                     "speedup"))
+    for swagger in sorted(Path(settings.swaggerDir).glob("*.json")):
+        operations = loadOperations(swagger)
+        total, legacyTime, compiledTime = 0, 0.0, 0.0
+        for operation in operations:
+            parsed = Processor(operation.parameterList).parse()
+            if len(parsed) == 0:
+                continue
+            total += len(parsed)
+            domain_map = dict()
+            for root in operation.parameterList:
+                for p in root.genDomain(operation.__repr__(), dict(), dict()):
+                    domain_map[p.getGlobalName()] = p.domain
+            paramNames = list(domain_map.keys())
+
+            start = time.perf_counter()
+            for _ in range(settings.repeat):
+                legacyActsConstraints(domain_map, paramNames, parsed)
+            legacyTime += time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(settings.repeat):
+                [c.toActs() for c in ACTS.actsConstraints(domain_map, paramNames, parsed)]
+            compiledTime += time.perf_counter() - start
+
+        legacyTime, compiledTime = legacyTime / settings.repeat * 1e6, compiledTime / settings.repeat * 1e6
+        print("{:<12}{:>6}{:>13}{:>13.1f}{:>13.1f}{:>9}".format(
+            swagger.stem, len(operations), total, legacyTime, compiledTime,
+            "{:.1f}x".format(legacyTime / compiledTime) if compiledTime > 0 else "-"))
+
+
+if __name__ == "__main__":
+    logger.remove()
+
+    parser = argparse.ArgumentParser(description="micro benchmarks of RestCT")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    constraintParser = subparsers.add_parser("constraints", help="translation of constraints into acts input")
+    constraintParser.add_argument("--swaggerDir", help="folder of swagger docs", type=str,
+                                  default=(EXP_DIR / "swagger/GitLab").as_posix())
+    constraintParser.add_argument("--repeat", help="translations per operation", type=int, default=1000)
+    constraintParser.set_defaults(run=constraints)
+
+    assembleParser = subparsers.add_parser("assemble", help="assembly of requests from rows of covering arrays")
+    assembleParser.add_argument("--swaggerDir", help="folder of swagger docs", type=str,
+                                default=(EXP_DIR / "swagger/GitLab").as_posix())
+    assembleParser.add_argument("--rows", help="random rows per operation", type=int, default=1000)
+    assembleParser.add_argument("--seed", help="random seed", type=int, default=0)
+    assembleParser.set_defaults(run=assemble)
+
+    pathParser = subparsers.add_parser("paths", help="semantic checks of operation sequences")
+    pathParser.add_argument("--swagger", help="swagger doc", type=str,
+                            default=(EXP_DIR / "swagger/GitLab/Project.json").as_posix())
+    pathParser.add_argument("--strength", help="coverage strength of the sequences", type=int, default=3)
+    pathParser.add_argument("--seed", help="random seed", type=int, default=0)
+    pathParser.set_defaults(run=paths)
+
+    args = parser.parse_args()
+    args.run(args)
@@ -0,0 +1,109 @@
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.InputStreamReader;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.security.Permission;
+import java.util.List;
+import java.util.jar.JarFile;
+
+/**
+ * Keeps one JVM alive for all the covering arrays generated by RestCT (see ActsWorker in src/ca.py).
+ * <p>
+ * request:  "[strength] [number of lines]", followed by the acts input model
+ * response: "OK [number of lines]", followed by the csv output of acts, or "ERR [message]"
+ * <p>
+ * acts ends with System.exit, which is trapped by a security manager: java 12 to 23 must be started with
+ * -Djava.security.manager=allow, java 24 and later cannot run the worker at all (it answers "ERR" instead of "READY")
+ */
+public class ActsWorker {
+    public static void main(String[] args) throws Exception {
+        String jar = args[0];
+        String mainClass;
+        try (JarFile jarFile = new JarFile(jar)) {
+            mainClass = jarFile.getManifest().getMainAttributes().getValue("Main-Class");
+        }
+        URLClassLoader loader = new URLClassLoader(new URL[]{new File(jar).toURI().toURL()});
+        Method entry = loader.loadClass(mainClass).getMethod("main", String[].class);
+
+        PrintStream out = new PrintStream(new FileOutputStream(FileDescriptor.out), true, "UTF-8");
+        // acts calls System.exit when the generation finishes
+        try {
+            System.setSecurityManager(new NoExit());
+        } catch (UnsupportedOperationException | SecurityException e) {
+            out.println("ERR unsupported: " + String.valueOf(e).replace('\n', ' '));
+            return;
+        }
+        // acts prints its progress on stdout, which is the channel of the protocol
+        System.setOut(new PrintStream(new OutputStream() {
+            @Override
+            public void write(int b) {
+            }
+        }));
+
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        out.println("READY");
+        String header;
+        while ((header = in.readLine()) != null) {
+            String[] parts = header.trim().split(" ");
+            int count = Integer.parseInt(parts[1]);
+            StringBuilder model = new StringBuilder();
+            for (int i = 0; i < count; i++) {
+                model.append(in.readLine()).append('\n');
+            }
+
+            Path input = Files.createTempFile("acts", ".txt");
+            Path output = Files.createTempFile("acts", ".csv");
+            try {
+                Files.write(input, model.toString().getBytes(StandardCharsets.UTF_8));
+                System.setProperty("algo", "ipog");
+                System.setProperty("doi", parts[0]);
+                System.setProperty("output", "csv");
+                try {
+                    entry.invoke(null, (Object) new String[]{input.toString(), output.toString()});
+                } catch (InvocationTargetException e) {
+                    if (!(e.getCause() instanceof ExitTrapped)) {
+                        throw e;
+                    }
+                }
+                List<String> lines = Files.readAllLines(output, StandardCharsets.UTF_8);
+                out.println("OK " + lines.size());
+                for (String line : lines) {
+                    out.println(line);
+                }
+            } catch (Throwable e) {
+                out.println("ERR " + String.valueOf(e).replace('\n', ' '));
+            } finally {
+                Files.deleteIfExists(input);
+                Files.deleteIfExists(output);
+            }
+        }
+    }
+
+    static class ExitTrapped extends SecurityException {
+    }
+
+    static class NoExit extends SecurityManager {
+        @Override
+        public void checkPermission(Permission perm) {
+        }
+
+        @Override
+        public void checkPermission(Permission perm, Object context) {
+        }
+
+        @Override
+        public void checkExit(int status) {
+            throw new ExitTrapped();
+        }
+    }
+}
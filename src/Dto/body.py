@@ -0,0 +1,195 @@
+import json
+import re
+import threading
+from json.decoder import scanstring
+from typing import Callable, Iterator, List, Tuple
+
+try:
+    import orjson
+except ImportError:
+    # optional, bodies are decoded by the json module without it
+    orjson = None
+
+
+_WS = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+def _skip(s, idx):
+    return _WS.match(s, idx).end()
+
+
+def scan(text: str, match: Callable[[str], bool], allItems=False, depth=None) -> Iterator[Tuple[List[str], object]]:
+    """
+    (path, value) of the keys of objects in a json document for which match(key) is True, only their values are decoded,
+    the other values are walked through if they are objects or arrays, up to depth nested objects.
+    paths are the keys from the root, only the first item of an array is walked through unless allItems.
+    a malformed (e.g. truncated) document is scanned up to the error
+    """
+    idx = _skip(text, 0)
+    try:
+        if text[idx:idx + 1] == "[" and not allItems:
+            # nothing follows the first item of a root array that is looked at
+            idx = _skip(text, idx + 1)
+            if text[idx:idx + 1] not in ("]", ""):
+                yield from _scanValue(text, idx, [], match, allItems, depth)
+        else:
+            yield from _scanValue(text, idx, [], match, allItems, depth)
+    except (ValueError, IndexError):
+        return
+
+
+def _scanValue(s, idx, path, match, allItems, depth):
+    c = s[idx:idx + 1]
+    if c == "{" and (depth is None or depth > 0):
+        return (yield from _scanObject(s, idx, path, match, allItems, None if depth is None else depth - 1))
+    if c == "[":
+        return (yield from _scanArray(s, idx, path, match, allItems, depth))
+    _, end = _DECODER.raw_decode(s, idx)
+    return end
+
+
+def _scanObject(s, idx, path, match, allItems, depth):
+    idx = _skip(s, idx + 1)
+    if s[idx] == "}":
+        return idx + 1
+    while True:
+        if s[idx] != '"':
+            raise ValueError("expecting a key at {}".format(idx))
+        key, idx = scanstring(s, idx + 1)
+        idx = _skip(s, idx)
+        if s[idx] != ":":
+            raise ValueError("expecting : at {}".format(idx))
+        idx = _skip(s, idx + 1)
+        if match(key):
+            value, idx = _DECODER.raw_decode(s, idx)
+            yield path + [key], value
+        else:
+            idx = yield from _scanValue(s, idx, path + [key], match, allItems, depth)
+        idx = _skip(s, idx)
+        if s[idx] == "}":
+            return idx + 1
+        if s[idx] != ",":
+            raise ValueError("expecting , at {}".format(idx))
+        idx = _skip(s, idx + 1)
+
+
+def _scanArray(s, idx, path, match, allItems, depth):
+    idx = _skip(s, idx + 1)
+    if s[idx] == "]":
+        return idx + 1
+    first = True
+    while True:
+        if first or allItems:
+            idx = yield from _scanValue(s, idx, path, match, allItems, depth)
+        else:
+            _, idx = _DECODER.raw_decode(s, idx)
+        first = False
+        idx = _skip(s, idx)
+        if s[idx] == "]":
+            return idx + 1
+        if s[idx] != ",":
+            raise ValueError("expecting , at {}".format(idx))
+        idx = _skip(s, idx + 1)
+
+
+def extract(text: str, path: List[str]):
+    """
+    the value at path in a json document, None if it is missing: an array on the way stands for its first item.
+    the values beside the path are skipped, the document is not decoded as a whole
+    """
+    idx = _skip(text, 0)
+    try:
+        for key in path:
+            if text[idx:idx + 1] == "[":
+                idx = _skip(text, idx + 1)
+            if text[idx:idx + 1] != "{":
+                return None
+            idx = _findKey(text, idx, key)
+            if idx is None:
+                return None
+        value, _ = _DECODER.raw_decode(text, idx)
+        return value
+    except (ValueError, IndexError):
+        return None
+
+
+def _findKey(s, idx, target):
+    """the position of the value of target in the object at idx, None if it has no such key"""
+    idx = _skip(s, idx + 1)
+    if s[idx] == "}":
+        return None
+    while True:
+        if s[idx] != '"':
+            return None
+        key, idx = scanstring(s, idx + 1)
+        idx = _skip(s, _skip(s, idx) + 1)
+        if key == target:
+            return idx
+        _, idx = _DECODER.raw_decode(s, idx)
+        idx = _skip(s, idx)
+        if s[idx] != ",":
+            return None
+        idx = _skip(s, idx + 1)
+
+
+class ResponseBody:
+    """
+    the raw body of a response, read up to a size cap, decoded on the first access to value:
+    the json document, or the text if the body is not json (e.g. because it was truncated).
+    a scannable body is not decoded for the few fields read by scan and extract
+    """
+
+    def __init__(self, content: bytes, encoding=None, truncated=False, scannable=False):
+        self.content = content
+        self.encoding = encoding
+        self.truncated = truncated
+        self.scannable = scannable
+        # the response throttled the request, see transport.is_throttled
+        self.throttled = False
+        self._value = None
+        self._decoded = False
+        self._lock = threading.Lock()
+
+    @property
+    def value(self):
+        if not self._decoded:
+            with self._lock:
+                if not self._decoded:
+                    self._value = self._decode()
+                    self._decoded = True
+        return self._value
+
+    def _decode(self):
+        if orjson is not None:
+            try:
+                return orjson.loads(self.content)
+            except orjson.JSONDecodeError:
+                pass
+        try:
+            return json.loads(self.content)
+        except (ValueError, UnicodeDecodeError):
+            return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def scan(self, match: Callable[[str], bool], allItems=False, depth=None) -> Iterator[Tuple[List[str], object]]:
+        return scan(self.text(), match, allItems, depth)
+
+    def extract(self, path: List[str]):
+        return extract(self.text(), path)
+
+    def __len__(self):
+        return len(self.content)
+
+    def __str__(self):
+        return str(self.value)
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def decoded(response):
+    """the decoded value of a response kept in a response chain"""
+    return response.value if isinstance(response, ResponseBody) else response
@@ -1,16 +1,18 @@
+import ast
 import json
 import os
 import re
 from collections import defaultdict, Counter
 from enum import Enum
 from pathlib import Path
-from typing import List, Set
+from typing import List, Set, Dict
 
 import spacy
 from spacy.matcher import Matcher
 from spacy.tokens import Doc
 
 from src.Dto.parameter import AbstractParam, EnumParam
+from src.expression import Expr, ExprParser, Compare
 
 Doc.set_extension("constraints", default=None, force=True)
 
@@ -139,23 +141,42 @@ class Constraint:
         self.paramNames = paramNames
         self.valueStr = values
         self.ents = ents       # in order
-
-    def toActs(self, valueDict: dict):
+        # the template is the repr of a tuple of constraints, parsed once and bound to the domains of every call,
+        # comparisons are kept as (paramName op value), None if the template can not be translated
+        exprs = [ExprParser(text).parse().bind(self._resolve) for text in ast.literal_eval(template)]
+        self._exprs: List[Expr] = [] if None in exprs else exprs
+
+    def _entity(self, token):
+        """AA -> ents[0], 'BB' -> ents[1], 'None' -> None"""
+        token = token.strip("'\"")
+        if token == "None":
+            return None
+        if re.fullmatch(r"([A-Z])\1", token) is None:
+            raise ValueError("unexpected operand {} in constraint: {}".format(token, self._template))
+        return self.ents[ord(token[0]) - 65]
+
+    def _resolve(self, comparison: Compare):
+        # a parameter compared with one of its values, comparisons between parameters are not supported
+        if comparison.op not in ("=", "==", "!="):
+            return None
+        try:
+            return Compare(self._entity(comparison.left), comparison.op, self._entity(comparison.right))
+        except (ValueError, IndexError):
+            return None
+
+    def bind(self, valueDict: dict, columns: Dict[str, int]) -> List[Expr]:
         """
         :param valueDict: parameters' domains. key: paramName, value: domain
-        :return: string in acts input format
+        :param columns: key: paramName, value: column index (acts parameter id)
+        :return: expressions over column and value indexes, empty if any value is not in the domains
         """
-        formattedStr = self._template
-        for matcher in re.finditer(r"(\w)\1\s*(!?=?=)\s*[\'\"]?(None|(\w)\4)[\'\"]?", self._template):
-            if matcher.group(3) == "None":
-                paramName, op, value = self.ents[ord(matcher.group(1)) - 65], matcher.group(2), None
-            else:
-                paramName, op, value = self.ents[ord(matcher.group(1)) - 65], matcher.group(2), self.ents[
-                    ord(matcher.group(4)) - 65]
+
+        def compare(comparison: Compare):
             try:
-                valueList = [v.val for v in valueDict.get(paramName)]
-                valueIndex = valueList.index(value)
-            except (ValueError, TypeError):
+                valueIndex = [v.val for v in valueDict.get(comparison.left)].index(comparison.right)
+                return Compare(columns[comparison.left], comparison.op, valueIndex, leftColumn=True)
+            except (ValueError, TypeError, KeyError):
                 return None
-            formattedStr = re.sub(matcher.group(), "{} {} {}".format(paramName, op, valueIndex), formattedStr)
-        return formattedStr
+
+        bound = [expr.bind(compare) for expr in self._exprs]
+        return [] if None in bound else bound
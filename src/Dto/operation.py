@@ -1,7 +1,8 @@
-from typing import List
+import re
+from typing import List, Dict
 
 from src.Dto.constraint import Constraint
-from src.Dto.keywords import Method, ParamKey, DocKey
+from src.Dto.keywords import Method, ParamKey, DocKey, Loc, DataType
 from src.Dto.parameter import AbstractParam, buildParam
 from src.Exception.exceptions import UnsupportedError
 
@@ -110,18 +111,101 @@ class RestPath:
         return all([e == o.elements[i] for i, e in enumerate(self.elements)])
 
 
+class PathTrie:
+    """
+    the paths of the operations interned element by element, to give every operation the masks (bits of operation ids)
+    of the operations at or above its path (ancestors) and at or below it (descendants), as is_ancestor_of would find
+    """
+
+    class Node:
+        def __init__(self):
+            self.children: Dict[str, PathTrie.Node] = dict()
+            self.operations: List["Operation"] = list()
+
+    def __init__(self, operations: List["Operation"]):
+        self._root = PathTrie.Node()
+        for operation in operations:
+            node = self._root
+            for element in operation.path.elements:
+                node = node.children.setdefault(element.__repr__(), PathTrie.Node())
+            node.operations.append(operation)
+        self._index(self._root, 0)
+
+    def _index(self, node, ancestors) -> int:
+        """set the masks of the operations in the subtree of node and return the mask of the subtree"""
+        here = 0
+        for operation in node.operations:
+            here |= 1 << operation.id
+        below = here
+        for child in node.children.values():
+            below |= self._index(child, ancestors | here)
+        for operation in node.operations:
+            operation.ancestors = ancestors | here
+            operation.descendants = below
+        return below
+
+
+class RequestTemplate:
+    """
+    the parts of the requests of an operation that do not depend on the row, compiled once:
+    the url split at path parameters, the static headers, and the parameters bucketed by location
+    """
+    _PLACEHOLDER = re.compile(r"\{([^{}]*)\}")
+
+    def __init__(self, operation):
+        # literal parts of the url at even positions, names of path parameters at odd positions
+        self.segments: List[str] = self._PLACEHOLDER.split(operation.url)
+        self.headers = {
+            'Content-Type': operation.header[0] if operation.header is not None else "applications/json",
+            'user-agent': 'my-app/0.0.1'
+        }
+
+        self.path: List[AbstractParam] = list()
+        self.files: List[AbstractParam] = list()
+        self.query: List[AbstractParam] = list()
+        self.header: List[AbstractParam] = list()
+        self.formData: List[AbstractParam] = list()
+        self.body: List[AbstractParam] = list()
+        # parameters of no location, an error if they are given a value
+        self.unexpected: List[AbstractParam] = list()
+
+        buckets = {Loc.Path: self.path, Loc.Query: self.query, Loc.Header: self.header,
+                   Loc.FormData: self.formData, Loc.Body: self.body}
+        for p in operation.parameterList:
+            if p.type is DataType.File:
+                self.files.append(p)
+            else:
+                buckets.get(p.loc, self.unexpected).append(p)
+
+    def url(self, values: dict) -> str:
+        """the url with the path parameters in values filled in, the others are left as placeholders"""
+        parts = list(self.segments)
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            parts[i] = values[name] if name in values else "{" + name + "}"
+        return "".join(parts)
+
+
 class Operation:
     def __init__(self, host: str, path: str, method, header):
         self._host = host
         self.path = RestPath(path)
         self.method: Method = Method(method)
         self.header = header
+        # dense index among the operations of the spec, assigned by the parser
+        self.id: int = -1
+        self._hash = hash(self.url + self.method.value)
+        # masks of the ids of the operations whose paths are ancestors and descendants of this path, see PathTrie
+        self.ancestors: int = 0
+        self.descendants: int = 0
 
         self.parameterList: List[AbstractParam] = list()
         self.responseList: List[Response] = list()
 
         self.constraints = list()
 
+        self._template = None
+
     # def genDomain(self, responseChain, okValues):
     #     paramList = list()
     #     for param in self.parameterList:
@@ -134,6 +218,13 @@ class Operation:
 
     def addParam(self, param: AbstractParam):
         self.parameterList.append(param)
+        self._template = None
+
+    @property
+    def template(self) -> RequestTemplate:
+        if self._template is None:
+            self._template = RequestTemplate(self)
+        return self._template
 
     def addResponse(self, response: Response):
         self.responseList.append(response)
@@ -148,7 +239,7 @@ class Operation:
         self.constraints = constraints
 
     def __hash__(self):
-        return hash(self.url + self.method.value)
+        return self._hash
 
     def __eq__(self, other):
         if isinstance(other, self.__class__) and self.url == other.url and self.method == other.method:
@@ -10,6 +10,7 @@ from typing import List, Union, Dict
 
 import Levenshtein
 
+from src.Dto.body import decoded, ResponseBody
 from src.Dto.keywords import Loc, ParamKey, DataType, DocKey
 
 
@@ -204,6 +205,7 @@ class AbstractParam(metaclass=abc.ABCMeta):
         self.value = None
         self.isReuse: bool = False
         self.parent: AbstractParam = None
+        self._globalName = None
 
     @staticmethod
     def getRef(ref: str, definitions: dict):
@@ -311,6 +313,13 @@ class AbstractParam(metaclass=abc.ABCMeta):
 
     @staticmethod
     def findDynamic(paramName, response, path=None):
+        if isinstance(response, ResponseBody):
+            if response.scannable:
+                # only the values of keys similar to the parameter are decoded
+                for local_path, value in response.scan(lambda k: AbstractParam.match(paramName, k) > 0.9):
+                    yield local_path, AbstractParam.match(paramName, local_path[-1]), value
+                return
+            response = response.value
         if re.search(r"[-_]?id[-_]?", paramName) is not None:
             name = "id"
         if path is None:
@@ -353,16 +362,32 @@ class AbstractParam(metaclass=abc.ABCMeta):
     def genRandom(self) -> list:
         pass
 
-    def printableValue(self, response):
-        if self.value is None:
+    def assignedValue(self, case=None):
+        """the value of the parameter in a covering array row, or the one set by getValueDto if no row is given"""
+        return self.value if case is None else case.get(self.getGlobalName(), None)
+
+    def printableValue(self, response, case=None):
+        """
+        @param case: a covering array row, read instead of self.value,
+        so that requests of several rows can be assembled at the same time
+        """
+        assigned = self.assignedValue(case)
+        if assigned is None:
             return None
-        value = self.value.val
-        if self.value.generator is ValueType.Random:
-            value = Fuzzer.mutate(self.value.val, r=1)[0]
-        if self.value.generator is ValueType.Dynamic:
-            opStr, path = self.value.val
+        return self._printable(assigned, response)
+
+    def _printable(self, assigned: Value, response):
+        """the value sent for an assigned value, computed once per parameter and row"""
+        value = assigned.val
+        if assigned.generator is ValueType.Random:
+            value = Fuzzer.mutate(assigned.val, r=1)[0]
+        if assigned.generator is ValueType.Dynamic:
+            opStr, path = assigned.val
             response = response.get(opStr)
-            value = self._assembleDynamic(path, response)
+            if isinstance(response, ResponseBody) and response.scannable:
+                value = response.extract(path)
+            else:
+                value = self._assembleDynamic(path, decoded(response))
         return value
 
     @staticmethod
@@ -387,10 +412,13 @@ class AbstractParam(metaclass=abc.ABCMeta):
         return self.name
 
     def getGlobalName(self):
-        if self.parent is not None:
-            return self.parent.getGlobalName() + "@" + self.name
-        else:
-            return self.name
+        # the parent is fixed once the parameter tree is built, looked up for every parameter of every request
+        if self._globalName is None:
+            if self.parent is not None:
+                self._globalName = self.parent.getGlobalName() + "@" + self.name
+            else:
+                self._globalName = self.name
+        return self._globalName
 
     @abc.abstractmethod
     def getValueDto(self, value_dict: Dict[str, Value]) -> Union:
@@ -448,13 +476,13 @@ class ObjectParam(AbstractParam):
     def genRandom(self):
         pass
 
-    def printableValue(self, response):
+    def printableValue(self, response, case=None):
         value = dict()
         for child in self._children:
-            childValue = child.printableValue(response)
+            childValue = child.printableValue(response, case)
             if childValue is not None:
-                value[child.name] = child.printableValue(response)
-        return None if len(value.keys()) == 0 else value
+                value[child.name] = childValue
+        return None if len(value) == 0 else value
 
     def getValueDto(self, value_dict: Dict[str, Value]):
         object_param = dict()
@@ -516,8 +544,8 @@ class ArrayParam(AbstractParam):
     def genRandom(self):
         pass
 
-    def printableValue(self, response):
-        value = self._item.printableValue(response)
+    def printableValue(self, response, case=None):
+        value = self._item.printableValue(response, case)
         if value is None:
             return None
         else:
@@ -590,16 +618,13 @@ class FileParam(AbstractParam):
             "long random long random"
         ])]
 
-    def printableValue(self, response):
+    def _printable(self, assigned: Value, response):
         # todo: Value
-        value = super(FileParam, self).printableValue(response)
-        if self.value is None:
-            return None
+        value = super(FileParam, self)._printable(assigned, response)
+        if assigned.generator is ValueType.Random:
+            return {'file': ('random.txt', value)}
         else:
-            if self.value.generator is ValueType.Random:
-                return {'file': ('random.txt', value)}
-            else:
-                return value
+            return value
 
     def getValueDto(self, value_dict: Dict[str, Value]) -> Union:
         self.value = value_dict.get(self.getGlobalName(), None)
@@ -684,17 +709,14 @@ class Date(AbstractParam):
                 randomValues.append((timeDto + timedelta(days=i + 1)).strftime(timeFormat))
         return randomValues
 
-    def printableValue(self, response):
-        value = super(Date, self).printableValue(response)
-        if self.value is None:
-            return None
-        else:
-            if self.value.generator is ValueType.Random:
-                try:
-                    value = Date.getMutate(datetime.strptime(value, '%Y-%m-%d'))[0]
-                except ValueError:
-                    value = Date.getMutate()[0]
-            return value
+    def _printable(self, assigned: Value, response):
+        value = super(Date, self)._printable(assigned, response)
+        if assigned.generator is ValueType.Random:
+            try:
+                value = Date.getMutate(datetime.strptime(value, '%Y-%m-%d'))[0]
+            except ValueError:
+                value = Date.getMutate()[0]
+        return value
 
     def getValueDto(self, value_dict: Dict[str, Value]) -> Union:
         self.value = value_dict.get(self.getGlobalName(), None)
@@ -734,19 +756,6 @@ class DateTime(AbstractParam):
                 randomValues.append((timeDto + timedelta(days=i + 1)).isoformat(timespec='seconds'))
         return randomValues
 
-    def printableValue(self, response):
-        value = super(DateTime, self).printableValue(response)
-        if self.value is None:
-            return None
-        else:
-            # valueType, _ = self.value
-            # if valueType is ValueType.Random:
-            #     try:
-            #         value = DateTime.getMutate(datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%fZ'))
-            #     except ValueError:
-            #         value = DateTime.getMutate(datetime.utcnow())[0]
-            return value
-
     def getValueDto(self, value_dict: Dict[str, Value]) -> Union:
         self.value = value_dict.get(self.getGlobalName(), None)
         return self.value
@@ -1,21 +1,39 @@
 import dataclasses
+import heapq
 import json
+import os
+import queue
 import re
 import shlex
 import subprocess
+import tempfile
+import threading
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from itertools import count
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from pathlib import Path
-from typing import List, Tuple, Dict, Union, Set
+from typing import List, Tuple, Dict, Union, Set, Optional
 
 import chardet
+import numpy as np
 import requests
+import urllib3
 from loguru import logger
 
+from src.Dto.body import ResponseBody, decoded, scan
 from src.Dto.constraint import Constraint, Processor
 from src.Dto.keywords import Loc, DataType, Method
 from src.Dto.operation import Operation
 from src.Dto.parameter import AbstractParam, ValueType, Value
+from src.Exception.exceptions import UnsupportedError
+from src.cache import CoveringArrayCache
+from src.coveringArray import CoveringArray, HISTORY_COLUMN
+from src.expression import Expr
+from src.ipog import IPOG, GreedySampler
+from src.latency import LatencyTracker
+from src.transport import Transport, CircuitBreaker, is_throttled, jsonBody
 
 
 def _saveChain(responseChains: List[dict], chain: dict, opStr: str, response):
@@ -26,12 +44,191 @@ def _saveChain(responseChains: List[dict], chain: dict, opStr: str, response):
         responseChains.pop(0)
 
 
+class ActsWorker:
+    """
+    a long-lived jvm running lib/ActsWorker.java, so that acts is not cold started for every covering array.
+    models and covering arrays are exchanged over stdin/stdout, the jvm is restarted if it crashes.
+    the worker traps the System.exit of acts with a security manager, so it runs on java 8 to 23 only
+    """
+
+    def __init__(self, jar, workplace: Path, timeout=60):
+        self._jar = Path(jar).absolute()
+        self._workplace = workplace
+        self._timeout = timeout
+
+        self._process = None
+        self._lines = None
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.latency = 0.0
+
+    @property
+    def avg_latency(self):
+        return self.latency / self.calls if self.calls > 0 else 0.0
+
+    def _compile(self):
+        source = Path(__file__).parent.parent / "lib/ActsWorker.java"
+        compiled = self._workplace / "ActsWorker.class"
+        if compiled.exists() and compiled.stat().st_mtime >= source.stat().st_mtime:
+            return
+        subprocess.run(["javac", "-d", str(self._workplace), str(source)], check=True,
+                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    @staticmethod
+    def _java_version() -> int:
+        """major version of the java on the path, e.g. 8 for 1.8.0_292"""
+        output = subprocess.run(["java", "-version"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                universal_newlines=True).stdout
+        matcher = re.search(r'version "(\d+)(?:\.(\d+))?', output)
+        if matcher is None:
+            raise UnsupportedError("unknown java version: {}".format(output.strip()))
+        major = int(matcher.group(1))
+        return int(matcher.group(2) or 0) if major == 1 else major
+
+    @staticmethod
+    def _pump(stream, lines: queue.Queue):
+        for line in stream:
+            lines.put(line.rstrip("\n"))
+        lines.put(None)
+
+    def _start(self):
+        version = self._java_version()
+        if version >= 24:
+            raise UnsupportedError("acts worker needs java 8 to 23, found java {}".format(version))
+        self._compile()
+        command = ["java", "-cp", str(self._workplace), "ActsWorker", str(self._jar)]
+        if version >= 12:
+            # the security manager is disabled by default from java 18 on
+            command.insert(1, "-Djava.security.manager=allow")
+        self._process = subprocess.Popen(command,
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                         universal_newlines=True, bufsize=1)
+        self._lines = queue.Queue()
+        threading.Thread(target=self._pump, args=(self._process.stdout, self._lines), daemon=True).start()
+        status = self._readline(time.time() + self._timeout)
+        if status.startswith("ERR unsupported"):
+            raise UnsupportedError("acts worker can not run: {}".format(status[4:]))
+        if status != "READY":
+            raise EOFError("acts worker failed to start")
+
+    def _readline(self, deadline):
+        try:
+            line = self._lines.get(timeout=max(0.0, deadline - time.time()))
+        except queue.Empty:
+            raise TimeoutError("acts worker did not respond in {} seconds".format(self._timeout))
+        if line is None:
+            raise EOFError("acts worker exited unexpectedly")
+        return line
+
+    def _kill(self):
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+    def call(self, strength: int, model: str) -> List[str]:
+        """send an acts input model, return the lines of the csv output"""
+        with self._lock:
+            start = time.time()
+            self.calls += 1
+            try:
+                for attempt in range(2):
+                    try:
+                        if self._process is None or self._process.poll() is not None:
+                            if self._process is not None or attempt > 0:
+                                self.restarts += 1
+                            self._kill()
+                            self._start()
+                        modelLines = model.rstrip("\n").split("\n")
+                        deadline = time.time() + self._timeout
+                        self._process.stdin.write("{} {}\n".format(strength, len(modelLines)))
+                        self._process.stdin.write("\n".join(modelLines) + "\n")
+                        self._process.stdin.flush()
+                        status = self._readline(deadline)
+                        if status.startswith("ERR"):
+                            raise Exception("acts failed: {}".format(status[4:]))
+                        return [self._readline(deadline) for _ in range(int(status.split(" ")[1]))]
+                    except (BrokenPipeError, EOFError):
+                        self._kill()
+                raise Exception("acts worker keeps crashing")
+            except TimeoutError:
+                self.timeouts += 1
+                self.failures += 1
+                self._kill()
+                raise
+            except UnsupportedError:
+                self.failures += 1
+                self._kill()
+                raise
+            except Exception:
+                self.failures += 1
+                raise
+            finally:
+                self.latency += time.time() - start
+
+    def close(self):
+        with self._lock:
+            if self._process is not None:
+                self._process.stdin.close()
+                try:
+                    self._process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self._kill()
+            self._process = None
+
+
+class PriorityPool:
+    """a thread pool that runs the waiting jobs with the lowest priority first, and in submission order otherwise"""
+
+    # a covering array needed right away, one of an upcoming operation, one that may be thrown away
+    URGENT, PREFETCH, SPECULATIVE = 0, 1, 2
+
+    def __init__(self, workers):
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._jobs = list()
+        self._order = count()
+        self._lock = threading.Lock()
+
+    def submit(self, priority, fn, *args) -> Future:
+        future = Future()
+        with self._lock:
+            heapq.heappush(self._jobs, (priority, next(self._order), future, fn, args))
+        # every submitted runner takes the most urgent job waiting at the time it starts
+        self._pool.submit(self._run_next)
+        return future
+
+    def _run_next(self):
+        with self._lock:
+            _, _, future, fn, args = heapq.heappop(self._jobs)
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
 class ACTS:
-    def __init__(self, dataPath, jar):
+    def __init__(self, dataPath, jar, persistent=False, timeout=60, workers=1):
         self._workplace = Path(dataPath) / "acts"
         self.jar = jar
+        self._timeout = timeout
         if not self._workplace.exists():
-            self._workplace.mkdir()
+            self._workplace.mkdir(exist_ok=True)
+        self._workers: Optional[queue.Queue] = None
+        if persistent:
+            self._workers = queue.Queue()
+            for _ in range(workers):
+                self._workers.put(ActsWorker(jar, self._workplace, timeout))
+        self._pool = PriorityPool(workers)
+        self.cache: Optional[CoveringArrayCache] = None
 
     @staticmethod
     def getId(paramName, paramNames):
@@ -43,40 +240,38 @@ class ACTS:
         index = int(paramId.lstrip("P"))
         return paramNames[index]
 
-    def transformConstraint(self, domain_map, paramNames, constraint: Constraint):
-        cStr = constraint.toActs(domain_map)
-        if cStr is None:
-            return ""
-        for paramName in constraint.paramNames:
-            pattern = r"\b" + paramName + r"\b"
-            paramId = self.getId(paramName, paramNames)
-            cStr = re.sub(re.compile(pattern), paramId, cStr)
-        return eval(cStr)
-
-    def writeInput(self, domain_map, paramNames, constraints, strength) -> Path:
-        inputFile = self._workplace / "input.txt"
-        with inputFile.open("w") as fp:
-            fp.write(
-                "\n".join(
-                    ['[System]', '-- specify system name', 'Name: {}'.format("acts" + str(strength)), '',
-                     '[Parameter]', '-- general syntax is parameter_name(type): value1, value2...\n'])
-            )
-            # write parameter ids
-            for paramName, domain in domain_map.items():
-                fp.write("{}(int):{}\n".format(self.getId(paramName, paramNames),
-                                               ",".join([str(i) for i in range(len(domain))])))
-
-            fp.write("\n")
-            # write constraints
-            if len(constraints) > 0:
-                fp.write("[Constraint]\n")
-                for c in constraints:
-                    [fp.write(ts + "\n") for ts in self.transformConstraint(domain_map, paramNames, c)]
-
-        return inputFile
+    @staticmethod
+    def actsConstraints(domain_map, paramNames, constraints: List[Constraint]) -> List[Expr]:
+        """constraints bound to the column (parameter id) and value indexes of the covering array"""
+        columns = {paramName: index for index, paramName in enumerate(paramNames)}
+        return [expr for c in constraints for expr in c.bind(domain_map, columns)]
+
+    def buildInput(self, domain_map, paramNames, actsConstraints: List[Expr], strength) -> str:
+        lines = ['[System]', '-- specify system name', 'Name: {}'.format("acts" + str(strength)), '',
+                 '[Parameter]', '-- general syntax is parameter_name(type): value1, value2...']
+        # write parameter ids
+        for paramName, domain in domain_map.items():
+            lines.append("{}(int):{}".format(self.getId(paramName, paramNames),
+                                             ",".join([str(i) for i in range(len(domain))])))
+
+        lines.append("")
+        # write constraints
+        if len(actsConstraints) > 0:
+            lines.append("[Constraint]")
+            lines.extend([c.toActs() for c in actsConstraints])
+
+        return "\n".join(lines) + "\n"
+
+    def writeInput(self, domain_map, paramNames, actsConstraints, strength) -> Path:
+        # every call has its own files, so that covering arrays can be generated concurrently
+        fd, inputFile = tempfile.mkstemp(prefix="input_", suffix=".txt", dir=str(self._workplace))
+        with os.fdopen(fd, "w") as fp:
+            fp.write(self.buildInput(domain_map, paramNames, actsConstraints, strength))
+
+        return Path(inputFile)
 
     def callActs(self, strength: int, inputFile) -> Path:
-        outputFile = self._workplace / "output.txt"
+        outputFile = inputFile.with_name(inputFile.name.replace("input_", "output_", 1))
         jarPath = Path(self.jar)
         algorithm = "ipog"
 
@@ -85,98 +280,194 @@ class ACTS:
                                                                                     str(jarPath),
                                                                                     str(inputFile),
                                                                                     str(outputFile))
-        stdout, stderr = subprocess.Popen(shlex.split(command, posix=False), stdout=subprocess.PIPE,
-                                          stderr=subprocess.PIPE).communicate()
+        process = subprocess.Popen(shlex.split(command, posix=False), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            stdout, stderr = process.communicate(timeout=self._timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise TimeoutError("acts did not finish in {} seconds".format(self._timeout))
         encoding = chardet.detect(stdout)["encoding"]
         stdout.decode(encoding)
         return outputFile
 
-    def parseOutput(self, outputFile: Path, domain_map, paramNames, history_ca_of_current_op: List[dict]):
+    def parseOutput(self, outputFile: Path, paramNames) -> np.ndarray:
         with outputFile.open("r") as fp:
-            lines = [line.strip("\n") for line in fp.readlines() if "#" not in line and len(line.strip("\n")) > 0]
-        paramNames = [self.getName(paramId, paramNames) for paramId in lines[0].strip("\n").split(",")]
-        coverArray: List[Dict[str, Value]] = list()
-        for line in lines[1:]:
-            valueDict = dict()
-            valueIndexList = line.strip("\n").split(",")
-            for i, valueIndex in enumerate(valueIndexList):
-                valueDict[paramNames[i]] = domain_map[paramNames[i]][int(valueIndex)]
-            if "history_ca_of_current_op" in valueDict.keys():
-                history_index = valueDict.pop("history_ca_of_current_op")
-                valueDict.update(history_ca_of_current_op[history_index.val])
-            coverArray.append(valueDict)
-
-        return coverArray
+            return self.parseLines(fp.readlines(), paramNames)
+
+    def parseLines(self, lines: List[str], paramNames) -> np.ndarray:
+        """read the csv output of acts as a value index matrix, columns are ordered as paramNames"""
+        lines = [line.strip("\n") for line in lines if "#" not in line and len(line.strip("\n")) > 0]
+        columns = [paramNames.index(self.getName(paramId, paramNames)) for paramId in lines[0].strip("\n").split(",")]
+        matrix = np.zeros((len(lines) - 1, len(paramNames)), dtype=np.int32)
+        for row, line in enumerate(lines[1:]):
+            matrix[row, columns] = [int(valueIndex) for valueIndex in line.strip("\n").split(",")]
+        return matrix
+
+    @staticmethod
+    def toCoverArray(matrix: np.ndarray, domain_map, paramNames, history_ca_of_current_op: List[dict]) -> CoveringArray:
+        return CoveringArray(matrix, paramNames, [domain_map[paramName] for paramName in paramNames],
+                             history_ca_of_current_op)
+
+    def generate(self, domain_map, paramNames, actsConstraints: List[Expr], strength: int) -> np.ndarray:
+        workers = self._workers
+        if workers is not None:
+            worker = workers.get()
+            try:
+                lines = worker.call(strength, self.buildInput(domain_map, paramNames, actsConstraints, strength))
+                return self.parseLines(lines, paramNames)
+            except UnsupportedError as e:
+                # no point in restarting the worker for every call, java is started per call from now on
+                if self._workers is not None:
+                    logger.warning("{}, acts is started for every covering array instead", e)
+                    self._workers = None
+            finally:
+                workers.put(worker)
+        inputFile = self.writeInput(domain_map, paramNames, actsConstraints, strength)
+        outputFile = self.callActs(strength, inputFile)
+        matrix = self.parseOutput(outputFile, paramNames)
+        # files of failed calls are kept for inspection
+        inputFile.unlink()
+        outputFile.unlink()
+        return matrix
 
     def process(self, domain_map, constraints: List[Constraint], strength: int, history_ca_of_current_op: List[dict]):
         strength = min(strength, len(domain_map.keys()))
         paramNames = list(domain_map.keys())
-        inputFile = self.writeInput(domain_map, paramNames, constraints, strength)
-        outputFile = self.callActs(strength, inputFile)
-        return self.parseOutput(outputFile, domain_map, paramNames, history_ca_of_current_op)
+        actsConstraints = self.actsConstraints(domain_map, paramNames, constraints)
+
+        if self.cache is None:
+            matrix = self.generate(domain_map, paramNames, actsConstraints, strength)
+        else:
+            key = self.cache.key([len(domain_map[p]) for p in paramNames], [c.toActs() for c in actsConstraints],
+                                 strength)
+            matrix = self.cache.get(key)
+            if matrix is None:
+                matrix = self.generate(domain_map, paramNames, actsConstraints, strength)
+                self.cache.put(key, matrix)
+            else:
+                logger.debug("        use cached covering array: {}", key)
+        return self.toCoverArray(matrix, domain_map, paramNames, history_ca_of_current_op)
+
+    def sample(self, domain_map, constraints: List[Constraint], strength: int, history_ca_of_current_op: List[dict],
+               time_budget: float) -> CoveringArray:
+        """a greedy random t-way sample generated within time_budget seconds, used when generation fails or is slow"""
+        strength = min(strength, len(domain_map.keys()))
+        paramNames = list(domain_map.keys())
+        actsConstraints = self.actsConstraints(domain_map, paramNames, constraints)
+        sizes = [len(domain_map[paramName]) for paramName in paramNames]
+        matrix = GreedySampler(sizes, strength, actsConstraints, time_budget=time_budget).generate()
+        return self.toCoverArray(matrix, domain_map, paramNames, history_ca_of_current_op)
+
+    def submit(self, domain_map, constraints: List[Constraint], strength: int,
+               history_ca_of_current_op: List[dict], priority=PriorityPool.URGENT) -> Future:
+        """generate a covering array in the background, safe to be called from several threads"""
+        return self._pool.submit(priority, self.process, domain_map, constraints, strength, history_ca_of_current_op)
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        if self.cache is not None:
+            logger.info("covering array cache hits: {}, misses: {}", self.cache.hits, self.cache.misses)
+        if self._workers is not None:
+            for worker in list(self._workers.queue):
+                logger.info("acts worker calls: {}, failures: {}, timeouts: {}, restarts: {}, avg latency: {:.3f}s",
+                            worker.calls, worker.failures, worker.timeouts, worker.restarts, worker.avg_latency)
+                worker.close()
+
+
+class NativeACTS(ACTS):
+    """
+    drop-in replacement of ACTS, covering arrays are generated in-process by IPOG instead of the acts jar.
+    a generation is aborted after timeout seconds (unlimited if None), so that it does not hold a worker forever
+    """
+
+    def __init__(self, dataPath, jar=None, workers=1, timeout=None):
+        self._workplace = Path(dataPath) / "acts"
+        self.jar = jar
+        self._timeout = timeout
+        self._workers = None
+        self._pool = PriorityPool(workers)
+        self.cache: Optional[CoveringArrayCache] = None
+
+    def generate(self, domain_map, paramNames, actsConstraints: List[Expr], strength: int) -> np.ndarray:
+        sizes = [len(domain_map[paramName]) for paramName in paramNames]
+        return IPOG(sizes, strength, actsConstraints, time_budget=self._timeout).generate()
 
 
 class Executor:
-    def __init__(self, queryAuth, headerAuth, manager):
-        self._auth = None if len(queryAuth) == 0 and len(headerAuth) == 0 else Auth(headerAuth, queryAuth)
+    def __init__(self, queryAuth, headerAuth, manager, pool_size=10, per_host=0, rate_limit=0, latency=None,
+                 breaker_threshold=5, max_outage=600, outage_listener=None, max_body=0, scan_from=0):
+        self.transport = Transport(queryAuth, headerAuth, pool_size, per_host=per_host, rate_limit=rate_limit)
         self._manager = manager
+        # bytes of a response body read at most, unlimited if 0
+        self._max_body = max_body
+        # bodies of at least these bytes are scanned for the fields read from them instead of decoded, never if 0
+        self._scan_from = scan_from
+        # timeouts of requests are derived from the latency of their operations
+        self.latency = LatencyTracker() if latency is None else latency
+        # requests are paused while the SUT is unreachable
+        self.breaker = CircuitBreaker(self.transport.probe, breaker_threshold, max_outage=max_outage,
+                                      listener=outage_listener)
 
     def process(self, operation, ca_item, previous_responses) -> Tuple[int, object]:
         """
         Executor的任务只有发送请求，不处理CA相关的东西
+        the parameters of the operation are not modified, rows can be processed concurrently
         @param operation: the target operation
         @param ca_item: assignment
         @param previous_responses: the chain
         @return: status code and response info
         """
-        self.setParamValue(operation, ca_item)
-        kwargs = self.assemble(operation, previous_responses)
+        kwargs = self.assemble(operation, previous_responses, ca_item)
         return self.send(operation, **kwargs)
 
     @staticmethod
-    def assemble(operation, responses) -> dict:
-        url = operation.url
-        headers = {
-            'Content-Type': operation.header[0] if operation.header is not None else "applications/json",
-            'user-agent': 'my-app/0.0.1'
-        }
+    def assemble(operation, responses, case=None) -> dict:
+        template = operation.template
+        pathValues = dict()
+        headers = dict(template.headers)
         params = dict()
         files = dict()
         formData = dict()
         body = dict()
 
-        for p in operation.parameterList:
-            value = p.printableValue(responses)
-            if value is None:
-                if p.loc is Loc.Path:
-                    url = url.replace("{" + p.name + "}", str("abc"))
-                # assert p.loc is not Loc.Path, "{}:{}".format(p.name, p.loc.value)
-            else:
-                if p.type is DataType.File:
-                    # todo: fixme: bug
-                    files = value
-                elif p.loc is Loc.Path:
-                    assert p.name != "" and p.name is not None
-                    url = url.replace("{" + p.name + "}", str(value))
-                elif p.loc is Loc.Query:
-                    params[p.name] = value
-                elif p.loc is Loc.Header:
-                    headers[p.name] = value
-                elif p.loc is Loc.FormData:
-                    if isinstance(value, dict):
-                        formData.update(value)
-                    else:
-                        formData[p.name] = value
-                elif p.loc is Loc.Body:
-                    if isinstance(value, dict):
-                        body.update(value)
-                    else:
-                        body[p.name] = value
-                else:
-                    raise Exception("unexpected Param Loc Type: {}".format(p.name))
+        for p in template.files:
+            value = p.printableValue(responses, case)
+            if value is not None:
+                # todo: fixme: bug
+                files = value
+            elif p.loc is Loc.Path:
+                pathValues.setdefault(p.name, "abc")
+        for p in template.path:
+            value = p.printableValue(responses, case)
+            # assert p.loc is not Loc.Path, "{}:{}".format(p.name, p.loc.value)
+            pathValues.setdefault(p.name, "abc" if value is None else str(value))
+        for p in template.query:
+            value = p.printableValue(responses, case)
+            if value is not None:
+                params[p.name] = value
+        for p in template.header:
+            value = p.printableValue(responses, case)
+            if value is not None:
+                headers[p.name] = value
+        for p in template.formData:
+            value = p.printableValue(responses, case)
+            if isinstance(value, dict):
+                formData.update(value)
+            elif value is not None:
+                formData[p.name] = value
+        for p in template.body:
+            value = p.printableValue(responses, case)
+            if isinstance(value, dict):
+                body.update(value)
+            elif value is not None:
+                body[p.name] = value
+        for p in template.unexpected:
+            if p.printableValue(responses, case) is not None:
+                raise Exception("unexpected Param Loc Type: {}".format(p.name))
 
         kwargs = dict()
-        kwargs["url"] = url
+        kwargs["url"] = template.url(pathValues)
         kwargs["headers"] = headers
         if len(params) > 0:
             kwargs["params"] = params
@@ -185,60 +476,67 @@ class Executor:
         if len(formData) > 0:
             kwargs["data"] = formData
         if len(body) > 0:
-            kwargs["data"] = json.dumps(body)
+            kwargs["data"] = jsonBody(body)
         return kwargs
 
-    @staticmethod
-    def setParamValue(operation, case):
-        # parameters: List[AbstractParam] = self._operation.genDomain(dict(), dict())
-        for p in operation.parameterList:
-            p.value = p.getValueDto(case)
-
     def send(self, operation, **kwargs) -> Tuple[int, Union[str, dict, None]]:
+        if not self.breaker.wait():
+            return 600, None
         self._manager.register_request()
+        status_code, response = self._send(operation, **kwargs)
+        if status_code >= 600:
+            self.breaker.failed(kwargs.get("url"))
+        else:
+            self.breaker.succeeded()
+        return status_code, response
 
+    def _send(self, operation, **kwargs) -> Tuple[int, Union[str, ResponseBody, None]]:
+        """the body is read up to max_body bytes and only decoded when a consumer reads it"""
         # for k, v in kwargs.items():
         #     logger.debug("{}: {}", k, v)
 
+        timeout = self.latency.timeout(operation)
         try:
-            feedback = getattr(requests, operation.method.value.lower())(**kwargs, timeout=50,
-                                                                         auth=self._auth)
+            feedback = self.transport.request(operation.method.value, timeout=timeout, stream=True, **kwargs)
+            # elapsed stops at the headers, the body is read afterwards
+            started = time.perf_counter()
+            try:
+                body = self.transport.read(feedback, self._max_body)
+            except requests.exceptions.ConnectionError as e:
+                # requests wraps a read timeout of the body into a ConnectionError
+                if len(e.args) > 0 and isinstance(e.args[0], urllib3.exceptions.ReadTimeoutError):
+                    raise requests.exceptions.ReadTimeout(e)
+                raise
+            elapsed = feedback.elapsed.total_seconds() + time.perf_counter() - started
+            body.scannable = 0 < self._scan_from <= len(body)
+            body.throttled = is_throttled(feedback)
         except TypeError:
             raise Exception("request type error: {}".format(operation.method.value.lower()))
         except requests.exceptions.Timeout:
+            self.latency.timed_out(operation, timeout)
             return 700, "timeout"
         except requests.exceptions.TooManyRedirects:
             raise Exception("bad url, try a different one\n url: {}".format(kwargs.get("url")))
         except requests.exceptions.RequestException:
             feedback = None
+        finally:
+            self._manager.register_connections(*self.transport.connection_counts())
 
         if feedback is None:
             # logger.debug("status code: {}", 600)
             return 600, None
-        try:
-            # logger.debug("status code: {}", feedback.status_code)
-            # logger.debug(feedback.json())
-            return feedback.status_code, feedback.json()
-        except json.JSONDecodeError:
-            return feedback.status_code, feedback.text
-
-
-class Auth:
-    def __init__(self, headerAuth, queryAuth):
-        self.headerAuth = headerAuth
-        self.queryAuth = queryAuth
-
-    def __call__(self, r):
-        for key, token in self.headerAuth.items():
-            r.headers[key] = token
-        for key, token in self.queryAuth.items():
-            r.params[key] = token
-        return r
+        self.latency.observe(operation, elapsed)
+        # logger.debug("status code: {}", feedback.status_code)
+        return feedback.status_code, body
 
 
 class RuntimeInfoManager:
     def __init__(self):
         self._num_of_requests = 0
+        # requests may be sent by several threads
+        self._lock = threading.Lock()
+        self._num_of_sent = 0
+        self._num_of_connections = 0
 
         self._ok_value_dict: Dict[str, List[Value]] = defaultdict(list)
         self._reused_essential_seq_dict: Dict[Tuple[Operation], List[Dict[str, Value]]] = defaultdict(list)
@@ -273,7 +571,22 @@ class RuntimeInfoManager:
         return p_name in self._unresolved_params
 
     def register_request(self):
-        self._num_of_requests += 1
+        with self._lock:
+            self._num_of_requests += 1
+
+    def register_connections(self, sent, opened):
+        self._num_of_sent = sent
+        self._num_of_connections = opened
+
+    @property
+    def num_of_connections(self):
+        """tcp connections opened to the SUT"""
+        return self._num_of_connections
+
+    @property
+    def num_of_reused_connections(self):
+        """requests sent over a kept-alive connection"""
+        return self._num_of_sent - self._num_of_connections
 
     def save_reuse(self, url_tuple, is_essential, case):
         if is_essential:
@@ -281,7 +594,8 @@ class RuntimeInfoManager:
         else:
             to_dict = self._reused_all_p_seq_dict
         if len(to_dict[url_tuple]) < 10:
-            to_dict[url_tuple].append(case)
+            # a row of a covering array keeps the whole array alive, only its values are kept
+            to_dict[url_tuple].append(dict(case))
 
     def save_ok_value(self, case):
         for paramStr, value in case.items():
@@ -300,6 +614,10 @@ class RuntimeInfoManager:
             self._response_chains.pop(0)
 
     def save_id_count(self, operation, response, id_counter):
+        if isinstance(response, ResponseBody) and response.scannable:
+            self._scan_id_count(operation, response, id_counter)
+            return
+        response = decoded(response)
         if isinstance(response, dict):
             iid = response.get("id")
             try:
@@ -329,6 +647,21 @@ class RuntimeInfoManager:
                 return {"__enum__": str(obj)}
             return json.JSONEncoder.default(self, obj)
 
+    @staticmethod
+    def _scan_id_count(operation, response: ResponseBody, id_counter):
+        """the ids of the created resource or of the items of a created list, without decoding the rest"""
+        text = response.text()
+        ids = [iid for _, iid in scan(text, lambda k: k == "id", allItems=True, depth=1)]
+        root = text.lstrip()[:1]
+        if root == "[":
+            for iid in ids:
+                try:
+                    id_counter.append((int(iid), operation.url))
+                except (TypeError, ValueError):
+                    pass
+        elif root == "{":
+            id_counter.append((ids[-1] if len(ids) > 0 else None, operation.url))
+
     def save_bug(self, operation, case, sc, response, chain, data_path):
         op_str_set = {d.get("method").name + d.get("url") + str(d.get("statusCode")) for d in self._bug_list}
         if operation.method.name + operation.url + str(sc) in op_str_set:
@@ -338,7 +671,7 @@ class RuntimeInfoManager:
             "method": operation.method,
             "parameters": {paramName: dataclasses.asdict(value) for paramName, value in case.items()},
             "statusCode": sc,
-            "response": response,
+            "response": decoded(response),
             "responseChain": [op.__repr__() for op in chain]
         }
         self._bug_list.append(bug_info)
@@ -371,13 +704,61 @@ class CA:
         self._eStrength = e_strength  # cover strength for essential parameters
 
         self._manager = RuntimeInfoManager()
-        self._acts = ACTS(data_path, acts_jar)
-        self._executor = Executor(kwargs.get("query_auth"), kwargs.get("header_auth"), self._manager)
+        if kwargs.get("generator") == "ipog":
+            # nobody waits for a covering array longer than ca_timeout, so the generation is aborted then
+            self._acts = NativeACTS(data_path, workers=kwargs.get("ca_workers", 1), timeout=kwargs.get("ca_timeout"))
+        else:
+            self._acts = ACTS(data_path, acts_jar, kwargs.get("acts_worker", False), kwargs.get("acts_timeout", 60),
+                              kwargs.get("ca_workers", 1))
+        if kwargs.get("cache_dir") is not None:
+            self._acts.cache = CoveringArrayCache(kwargs.get("cache_dir"), max_bytes=kwargs.get("cache_size"))
+        # rows of an operation sent at the same time, they are sent one by one if 1
+        self._max_in_flight = kwargs.get("max_in_flight", 1)
+        self._senders = ThreadPoolExecutor(max_workers=self._max_in_flight) if self._max_in_flight > 1 else None
+        self._executor = Executor(kwargs.get("query_auth"), kwargs.get("header_auth"), self._manager,
+                                  max(kwargs.get("pool_size", 10), self._max_in_flight), kwargs.get("per_host", 0),
+                                  kwargs.get("rate_limit", 0),
+                                  LatencyTracker(kwargs.get("timeout_floor", 50), kwargs.get("timeout_ceiling", 50),
+                                                 demote_after=kwargs.get("demote_after", 3)),
+                                  kwargs.get("breaker_threshold", 5), kwargs.get("max_outage", 600),
+                                  self._record_outage, kwargs.get("max_body", 0), kwargs.get("scan_from", 0))
+        self._gate = threading.Lock()
 
         self._data_path = data_path
         self._start_time = time.time()
         self._stat = kwargs.get("stat")
 
+        # seconds to wait for a covering array before sampling one instead (None waits until it is generated),
+        # and the time budget of sampling
+        self._ca_timeout = kwargs.get("ca_timeout")
+        self._fallback_time = kwargs.get("fallback_time", 2)
+
+        # drop redundant rows of generated covering arrays
+        self._minimize = kwargs.get("minimize", False)
+        # send rows covering the most new combinations first
+        self._order_rows = kwargs.get("order_rows", False)
+        self._budget = float("inf")
+
+        # number of upcoming operations whose essential covering arrays are generated in advance
+        self._prefetch_depth = kwargs.get("prefetch", 0)
+        # prefetched covering arrays and reset constraints belong to the sequence run by a thread, so that sequences
+        # run at the same time by AsyncEngine do not take or cancel those of each other
+        self._sequence_state = threading.local()
+        # generate the all-parameter covering array while the essential cases are sent
+        self._speculate_all = kwargs.get("speculate_all", False)
+
+    @property
+    def _prefetched(self) -> Dict[Operation, Tuple[tuple, Future, dict]]:
+        if not hasattr(self._sequence_state, "prefetched"):
+            self._sequence_state.prefetched = dict()
+        return self._sequence_state.prefetched
+
+    @property
+    def _constraints_ready(self) -> Set[Operation]:
+        if not hasattr(self._sequence_state, "constraints_ready"):
+            self._sequence_state.constraints_ready = set()
+        return self._sequence_state.constraints_ready
+
     def _select_response_chains(self, response_chains):
         """get _maxChainItems longest chains"""
         sortedList = sorted(response_chains, key=lambda c: len(c.keys()), reverse=True)
@@ -393,29 +774,85 @@ class CA:
         if len(ca) == 0:
             raise Exception("the size of ca can not be zero")
 
+        if self._order_rows and isinstance(ca, CoveringArray):
+            ca = ca.order_by_coverage(self._eStrength, self._required_names(operation))
+
         response_list: List[(int, object)] = []
-        for case in ca:
-            self._stat.dump_snapshot()
-            status_code, response = self._executor.process(operation, case, chain)
+        for case, (status_code, response) in self._send(operation, ca, chain):
             response_list.append((status_code, response))
 
             if status_code < 300:
                 has_success = True
                 history.append(case)
-            elif 500 <= status_code < 600:
+            elif 500 <= status_code < 600 and not self._throttled(response):
                 has_bug = True
 
         logger.info(f"status code list:{[sc for (sc, r) in response_list]}")
 
+        if self._order_rows and isinstance(ca, CoveringArray):
+            curve = ca.coverage_curve(self._eStrength)
+            if curve is not None:
+                self._stat.add_coverage_curve(operation, is_essential, curve[:len(response_list)], int(curve[-1]))
+
         self._handle_feedback(url_tuple, operation, response_list, chain, ca, is_essential)
 
         return has_success or has_bug
 
+    def _send(self, operation, ca, chain):
+        """
+        yield (row, (status code, response)) in row order, up to max_in_flight requests are sent at the same time.
+        rows left when the budget expires are not sent, nor those of an operation demoted for timing out
+        """
+        pending = deque()
+        for index, case in enumerate(ca):
+            if self._timeout(self._start_time, self._budget):
+                break
+            if index > 0 and self._executor.latency.demoted(operation):
+                logger.debug("{} keeps timing out, {} rows are skipped", operation, len(ca) - index)
+                break
+            self._stat.dump_snapshot()
+            if self._senders is None:
+                with self._released():
+                    result = self._executor.process(operation, case, chain)
+                yield case, result
+                continue
+            pending.append((case, self._senders.submit(self._executor.process, operation, case, chain)))
+            if len(pending) >= self._max_in_flight:
+                case, future = pending.popleft()
+                with self._released():
+                    result = future.result()
+                yield case, result
+        while len(pending) > 0:
+            case, future = pending.popleft()
+            with self._released():
+                result = future.result()
+            yield case, result
+
+    @contextmanager
+    def _released(self):
+        """other sequences run by AsyncEngine go on while this one waits for the SUT or a covering array"""
+        self._gate.release()
+        try:
+            yield
+        finally:
+            self._gate.acquire()
+
+    @staticmethod
+    def _throttled(response) -> bool:
+        return isinstance(response, ResponseBody) and response.throttled
+
+    @staticmethod
+    def _required_names(operation):
+        return {p.getGlobalName() for root in operation.parameterList for p in root.seeAllParameters() if p.required}
+
     def _handle_feedback(self, url_tuple, operation, response_list, chain, ca, is_essential):
         is_success = False
         for index, (sc, response) in enumerate(response_list):
             self._stat.req_num += 1
-            if sc < 300:
+            if self._throttled(response):
+                # the SUT is overloaded, neither a bug nor a rejected input
+                self._stat.req_throttled_num += 1
+            elif sc < 300:
                 self._manager.save_reuse(url_tuple, is_essential, ca[index])
                 self._manager.save_ok_value(ca[index])
                 self._manager.save_chain(chain, operation, response)
@@ -456,19 +893,34 @@ class CA:
 
         history = []
 
-        self._reset_constraints(operation, operation.parameterList)
+        if operation in self._constraints_ready:
+            self._constraints_ready.discard(operation)
+        else:
+            self._reset_constraints(operation, operation.parameterList)
 
         e_ca = self._handle_essential_params(operation, sequence[:index], chain, history)
         logger.info(f"{index + 1}-th operation essential parameters covering array size: {len(e_ca)}, "
                     f"parameters: {len(e_ca[0]) if len(e_ca) > 0 else 0}, constraints: {len(operation.constraints)}")
 
+        # the all-parameter covering array only depends on the essential one through the successful cases,
+        # so it may be generated in the background while the essential cases are sent and used if none succeeds
+        a_ca_future, a_domain_map = None, None
+        if self._speculate_all and not all([p.isEssential for p in operation.parameterList]):
+            a_ca_future, a_domain_map = self._submit_all_params(operation, sequence[:index], chain)
+
         is_break_e = self._executes(operation, e_ca, chain, success_url_tuple, history, True)
 
         if all([p.isEssential for p in operation.parameterList]):
             return is_break_e
 
         # todo history is not None, add return values of executes
-        a_ca = self._handle_all_params(operation, sequence[:index], chain, history)
+        if len(history) == 0 and a_ca_future is not None:
+            a_ca = self._resolve(a_ca_future, a_domain_map, operation.constraints, self._eStrength, [])
+        else:
+            if a_ca_future is not None:
+                a_ca_future.cancel()
+            # the domains of the parameters that are not essential do not depend on the essential cases
+            a_ca = self._handle_all_params(operation, sequence[:index], chain, history, a_domain_map)
         logger.info(f"{index + 1}-th operation all parameters covering array size: {len(a_ca)}, "
                     f"parameters: {len(a_ca[0]) if len(a_ca) > 0 else 0}, constraints: {len(operation.constraints)}")
 
@@ -495,9 +947,13 @@ class CA:
         if len(parameter_list) == 0:
             return [{}]
 
+        prefetched = self._take_prefetched(operation, parameter_list)
+        if prefetched is not None:
+            return prefetched
+
         return self._cover_params(operation, parameter_list, operation.constraints, chain, history)
 
-    def _handle_all_params(self, operation, exec_ops, chain, history):
+    def _handle_all_params(self, operation, exec_ops, chain, history, domain_map=None):
         reused_case = self._manager.get_reused_with_all_p(tuple(exec_ops + [operation]))
         if len(reused_case) > 0:
             # 执行过
@@ -506,9 +962,66 @@ class CA:
 
         parameter_list = operation.parameterList
 
-        return self._cover_params(operation, parameter_list, operation.constraints, chain, history)
+        return self._cover_params(operation, parameter_list, operation.constraints, chain, history, domain_map)
+
+    def _submit_all_params(self, operation, exec_ops, chain) -> Tuple[Optional[Future], Optional[dict]]:
+        if self._manager.all_executed(tuple(exec_ops + [operation])):
+            return None, None
+        domain_map = self._build_domain_map(operation, operation.parameterList, chain, [])
+        future = self._acts.submit(domain_map, operation.constraints, self._eStrength, [], PriorityPool.SPECULATIVE)
+        return future, domain_map
 
-    def _cover_params(self, operation, parameters, constraints, chain, history_ca_of_current_op: List[dict]):
+    def _prefetch(self, sequence, index):
+        """
+        generate the essential covering arrays of the next operations in the background while the current one is sent.
+        only operations without path parameters are prefetched, as their domains do not depend on the response chain
+        """
+        for j in range(index + 1, min(index + 1 + self._prefetch_depth, len(sequence))):
+            operation = sequence[j]
+            if operation in self._prefetched or len(operation.parameterList) == 0:
+                continue
+            if any([p.loc is Loc.Path for p in operation.parameterList]):
+                continue
+            if self._manager.essential_executed(tuple(sequence[:j] + [operation])):
+                continue
+
+            if operation not in self._constraints_ready:
+                self._reset_constraints(operation, operation.parameterList)
+                self._constraints_ready.add(operation)
+            parameter_list = list(filter(lambda p: p.isEssential, operation.parameterList))
+            if len(parameter_list) == 0:
+                continue
+
+            domain_map = self._build_domain_map(operation, parameter_list, dict(), [])
+            future = self._acts.submit(domain_map, operation.constraints, self._eStrength, [], PriorityPool.PREFETCH)
+            self._prefetched[operation] = (self._prefetch_fingerprint(operation, parameter_list), future, domain_map)
+
+    def _prefetch_fingerprint(self, operation, parameters) -> tuple:
+        """apart from the response chain, domains only change with the ok values of the operation"""
+        ok_values = self._manager.get_ok_value_dict()
+        # the same keys as AbstractParam._getOkValue, which is how ok values reach the domains
+        op_str = operation.__repr__()
+        return tuple(len(ok_values.get(op_str + p.name, [])) for root in parameters for p in root.seeAllParameters())
+
+    def _take_prefetched(self, operation, parameters):
+        fingerprint, future, domain_map = self._prefetched.pop(operation, (None, None, None))
+        if future is None:
+            return None
+        if fingerprint != self._prefetch_fingerprint(operation, parameters):
+            logger.debug("        prefetched covering array is stale, regenerate")
+            future.cancel()
+            return None
+        logger.debug("        use prefetched covering array")
+        return self._resolve(future, domain_map, operation.constraints, self._eStrength, [])
+
+    def _cancel_prefetched(self):
+        for _, future, _ in self._prefetched.values():
+            future.cancel()
+        self._prefetched.clear()
+        self._constraints_ready.clear()
+
+    def _cover_params(self, operation, parameters, constraints, chain, history_ca_of_current_op: List[dict],
+                      domain_map=None):
         """
         generate domain for each parameter of the current operation
         @param history_ca_of_current_op: ca_1 -> ca_2 -> ca_3, currently, essential_ca -> all_ca
@@ -516,22 +1029,35 @@ class CA:
         @param parameters: parameter list
         @param constraints: the constraints among parameters
         @param chain: a response chain
+        @param domain_map: the domains of the parameters if they are already generated
         @return: the parameters and their domains
         """
 
         if history_ca_of_current_op is None:
             history_ca_of_current_op = []
 
-        domain_map = defaultdict(list)
-        for root_p in parameters:
-            p_with_children = root_p.genDomain(operation.__repr__(), chain, self._manager.get_ok_value_dict())
-            for p in p_with_children:
-                if not self._manager.is_unresolved(operation.__repr__() + p.name):
-                    domain_map[p.getGlobalName()] = p.domain
+        domain_map = self._build_domain_map(operation, parameters, chain, history_ca_of_current_op, domain_map)
+        if domain_map is None:
+            return [{}]
+
+        return self._call_acts(domain_map, constraints, self._eStrength, history_ca_of_current_op)
+
+    def _build_domain_map(self, operation, parameters, chain, history_ca_of_current_op: List[dict], domain_map=None):
+        """
+        @param domain_map: the domains of parameters if they are already generated, only the history is added
+        @return: the domains of parameters, None if the constraints involve unresolved parameters
+        """
+        if domain_map is None:
+            domain_map = defaultdict(list)
+            for root_p in parameters:
+                p_with_children = root_p.genDomain(operation.__repr__(), chain, self._manager.get_ok_value_dict())
+                for p in p_with_children:
+                    if not self._manager.is_unresolved(operation.__repr__() + p.name):
+                        domain_map[p.getGlobalName()] = p.domain
 
         if history_ca_of_current_op is not None and len(history_ca_of_current_op) > 0:
             new_domain_map = {
-                "history_ca_of_current_op": [Value(v, ValueType.Reused, DataType.Int32) for v in
+                HISTORY_COLUMN: [Value(v, ValueType.Reused, DataType.Int32) for v in
                                              range(len(history_ca_of_current_op))]}
 
             for p in domain_map.keys():
@@ -541,24 +1067,68 @@ class CA:
             for c in operation.constraints:
                 for p in c.paramNames:
                     if self._manager.is_unresolved(p):
-                        return [{}]
+                        return None
 
             domain_map = new_domain_map
 
         for p, v in domain_map.items():
             logger.debug(f"            {p}: {len(v)} - {v}")
 
-        return self._call_acts(domain_map, constraints, self._eStrength, history_ca_of_current_op)
+        return domain_map
 
     def _call_acts(self, domain_map, constraints, strength, history_ca_of_current_op):
-        try:
-            return self._acts.process(domain_map, constraints, strength, history_ca_of_current_op)
-        except Exception:
-            logger.warning("call acts wrong")
+        future = self._acts.submit(domain_map, constraints, strength, history_ca_of_current_op)
+        return self._resolve(future, domain_map, constraints, strength, history_ca_of_current_op)
 
-    @staticmethod
-    def _timeout(start_time, budget):
-        return time.time() - start_time > budget
+    def _resolve(self, future: Future, domain_map, constraints, strength, history_ca_of_current_op):
+        try:
+            with self._released():
+                ca = future.result(timeout=self._ca_timeout)
+        except FutureTimeoutError:
+            # cancel only drops a job that has not started, a running one goes on until it finishes (and its result is
+            # cached) or the acts timeout, or the time budget of ipog, aborts it
+            future.cancel()
+            logger.warning("covering array is not generated in {} seconds", self._ca_timeout)
+            return self._fallback(domain_map, constraints, strength, history_ca_of_current_op)
+        except Exception as e:
+            logger.warning("call acts wrong: {}", e)
+            return self._fallback(domain_map, constraints, strength, history_ca_of_current_op)
+        self._stat.ca_num += 1
+        return self._post_process(ca)
+
+    def _fallback(self, domain_map, constraints, strength, history_ca_of_current_op):
+        self._stat.ca_num += 1
+        self._stat.ca_fallbacks += 1
+        try:
+            ca = self._acts.sample(domain_map, constraints, strength, history_ca_of_current_op, self._fallback_time)
+        except Exception as e:
+            logger.warning("sample t-way combinations wrong: {}", e)
+            return [{}]
+        logger.info("        sampled {} rows instead", len(ca))
+        return self._post_process(ca)
+
+    def _post_process(self, ca: CoveringArray) -> CoveringArray:
+        if self._minimize:
+            minimized = ca.minimize(self._eStrength)
+            logger.debug("        minimize covering array: {} -> {}", len(ca), len(minimized))
+            self._stat.ca_rows_before += len(ca)
+            self._stat.ca_rows_after += len(minimized)
+            ca = minimized
+        return ca
+
+    def _timeout(self, start_time, budget):
+        """the time the SUT was unreachable is not spent from the budget"""
+        breaker = self._executor.breaker
+        return breaker.dead or time.time() - start_time - breaker.outage() > budget
+
+    def _record_outage(self, started, seconds):
+        # called by the breaker from the threads sending requests, which do not hold the gate
+        with self._stat.lock:
+            if started:
+                self._stat.outage_num += 1
+            else:
+                self._stat.outage_time += seconds
+            self._stat.dump_snapshot(True)
 
     @staticmethod
     def _reset_constraints(operation: Operation, parameters: List[AbstractParam]):
@@ -566,20 +1136,44 @@ class CA:
         constraints: List[Constraint] = constraint_processor.parse()
         operation.set_constraints(constraints)
 
+    def close(self):
+        self._acts.close()
+        if self._senders is not None:
+            self._senders.shutdown()
+        logger.info("connections opened: {}, reused: {}", self._manager.num_of_connections,
+                    self._manager.num_of_reused_connections)
+        limiter = self._executor.transport.limiter
+        if limiter is not None:
+            logger.info("throttled: {}, final rate: {:.2f}/s, waited: {:.1f}s", limiter.throttles, limiter.rate,
+                        limiter.waited)
+        self._stat.latencies = self._executor.latency.report()
+        for operation, _, timeouts, *_, demoted in self._stat.latencies:
+            if demoted:
+                logger.info("{} was demoted after {} timeouts", operation, timeouts)
+        self._executor.transport.close()
+
     def clear_up(self):
         for iid, url in self._id_counter:
             resource_id = url.rstrip("/") + "/" + str(iid)
             try:
-                requests.delete(url=resource_id, auth=Auth())
+                self._executor.transport.request("delete", url=resource_id)
             except Exception:
                 continue
 
     def handle(self, sequence, budget):
+        # the state is shared by the sequences run at the same time, only one of them runs between two requests
+        with self._gate:
+            return self._handle_sequence(sequence, budget)
+
+    def _handle_sequence(self, sequence, budget):
+        self._budget = budget
         for index, operation in enumerate(sequence):
             logger.debug("{}-th operation: {}*{}", index + 1, operation.method.value, operation.url)
             chainList = self._manager.get_chains(self._maxChainItems)
+            self._prefetch(sequence, index)
             while len(chainList):
                 if self._timeout(self._start_time, budget):
+                    self._cancel_prefetched()
                     self._stat.seq_executed_num += 1
                     self._stat.sum_len_of_executed_seq += index
                     self._stat.update_executed_c_way(sequence[:index])
@@ -588,6 +1182,7 @@ class CA:
                 is_break = self._handle_one_operation(index, operation, chain, sequence)
                 if is_break:
                     break
+        self._cancel_prefetched()
         self._stat.seq_executed_num += 1
         self._stat.sum_len_of_executed_seq += len(sequence)
         self._stat.update_executed_c_way(sequence)
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+
+class CoveringArrayCache:
+    """
+    covering arrays stored as value index matrices, keyed by the structure of the model they solve:
+    domain sizes (in parameter id order), constraints in acts syntax and strength.
+    the most recently used arrays are kept in memory, all of them are kept in a folder
+    whose size is capped by evicting the least recently used files.
+    the files are only listed at startup, after that their sizes are tracked as they are written
+    """
+
+    def __init__(self, folder, capacity=128, max_bytes=64 * 1024 * 1024):
+        self._folder = Path(folder)
+        self._folder.mkdir(parents=True, exist_ok=True)
+        self._capacity = capacity
+        self._max_bytes = max_bytes
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        # file sizes from the least to the most recently used, and their total
+        self._files: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._scan()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(sizes: List[int], constraints: List[str], strength: int) -> str:
+        normalized = sorted(re.sub(r"\s+", " ", c.strip()) for c in constraints)
+        payload = json.dumps([[int(s) for s in sizes], normalized, int(strength)])
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _file(self, key) -> Path:
+        return self._folder / "{}.npy".format(key)
+
+    def get(self, key) -> Optional[np.ndarray]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key].astype(np.int32)
+
+            file = self._file(key)
+            try:
+                matrix = np.load(file)
+                file.touch()
+            except (OSError, ValueError):
+                self._forget(key)
+                self.misses += 1
+                return None
+            if key in self._files:
+                self._files.move_to_end(key)
+            self._remember(key, matrix)
+            self.hits += 1
+            return matrix.astype(np.int32)
+
+    def put(self, key, matrix: np.ndarray):
+        largest = int(matrix.max()) if matrix.size > 0 else 0
+        if largest < np.iinfo(np.uint8).max:
+            matrix = matrix.astype(np.uint8)
+        elif largest < np.iinfo(np.uint16).max:
+            matrix = matrix.astype(np.uint16)
+        with self._lock:
+            self._remember(key, matrix)
+            # write then rename, other runs may read the folder at the same time
+            file = self._file(key)
+            temp = file.with_name("{}.{}.{}.tmp".format(key, os.getpid(), threading.get_ident()))
+            try:
+                with temp.open("wb") as fp:
+                    np.save(fp, matrix)
+                os.replace(str(temp), str(file))
+                size = file.stat().st_size
+            except OSError:
+                return
+            self._forget(key)
+            self._files[key] = size
+            self._bytes += size
+            self._shrink()
+
+    def _remember(self, key, matrix):
+        self._memory[key] = matrix
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._capacity:
+            self._memory.popitem(last=False)
+
+    def _scan(self):
+        files = list()
+        for f in self._folder.glob("*.npy"):
+            try:
+                stat = f.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, f.stem))
+        for _, size, key in sorted(files):
+            self._files[key] = size
+            self._bytes += size
+        self._shrink()
+
+    def _forget(self, key):
+        self._bytes -= self._files.pop(key, 0)
+
+    def _shrink(self):
+        while self._bytes > self._max_bytes and len(self._files) > 0:
+            key, size = self._files.popitem(last=False)
+            self._bytes -= size
+            try:
+                self._file(key).unlink()
+            except OSError:
+                pass
@@ -0,0 +1,158 @@
+import heapq
+from collections.abc import Mapping, Sequence
+from itertools import combinations
+from typing import List, Optional
+
+import numpy as np
+
+from src.Dto.parameter import Value
+
+HISTORY_COLUMN = "history_ca_of_current_op"
+
+# (rows x column groups) above which t-way tuples are not enumerated
+MAX_TUPLE_CODES = 20_000_000
+
+
+class CoveringArray(Sequence):
+    """
+    a covering array held as a value index matrix: column i is the parameter columns[i],
+    and matrix[r, i] is an index into domains[i]. a row only turns into Values when it is read,
+    the history column refers to the rows of the covering array executed before (see CA._cover_params)
+    """
+
+    def __init__(self, matrix: np.ndarray, columns: List[str], domains: List[List[Value]],
+                 history: Optional[Sequence] = None):
+        self.matrix = matrix
+        self.columns = columns
+        self.domains = domains
+        # CA._executes clears and refills the history list of the current operation, keep a snapshot
+        self.history = list(history) if history is not None else []
+        self._column_index = {name: i for i, name in enumerate(columns) if name != HISTORY_COLUMN}
+        self._history_column = columns.index(HISTORY_COLUMN) if HISTORY_COLUMN in columns else None
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("covering array row out of range: {}".format(index))
+        return CoveringArrayRow(self, index)
+
+    def take(self, indexes) -> "CoveringArray":
+        """a covering array made of the given rows, in the given order"""
+        return CoveringArray(self.matrix[list(indexes)], self.columns, self.domains, self.history)
+
+    def tuple_codes(self, strength: int) -> Optional[np.ndarray]:
+        """
+        the t-way value combinations covered by every row, shape (rows, C(columns, t)),
+        codes are dense ids shared by equal combinations. None if the array is too large
+        """
+        strength = min(strength, len(self.columns))
+        combos = np.array(list(combinations(range(len(self.columns)), strength)), dtype=np.int64)
+        if strength == 0 or len(self) == 0 or len(combos) * len(self) > MAX_TUPLE_CODES:
+            return None
+        sizes = np.array([len(d) for d in self.domains], dtype=np.int64)
+        codes = np.zeros((len(self), len(combos)), dtype=np.int64)
+        for j in range(strength):
+            codes = codes * sizes[combos[:, j]] + self.matrix[:, combos[:, j]]
+        widths = np.prod(sizes[combos], axis=1)
+        codes += np.concatenate([[0], np.cumsum(widths)[:-1]])
+        _, dense = np.unique(codes, return_inverse=True)
+        return dense.reshape(codes.shape)
+
+    def minimize(self, strength: int) -> "CoveringArray":
+        """drop rows whose t-way combinations are all covered by other rows"""
+        codes = self.tuple_codes(strength)
+        if codes is None:
+            return self
+        counts = np.bincount(codes.ravel())
+        keep = np.ones(len(self), dtype=bool)
+        for r in range(len(self) - 1, -1, -1):
+            if (counts[codes[r]] > 1).all():
+                counts[codes[r]] -= 1
+                keep[r] = False
+        return self if keep.all() else self.take(np.flatnonzero(keep))
+
+    def order_by_coverage(self, strength: int, required=()) -> "CoveringArray":
+        """
+        reorder rows greedily, so that every prefix covers as many t-way combinations as possible,
+        ties are broken by fewer null values of required parameters, then by the original order
+        """
+        codes = self.tuple_codes(strength)
+        if codes is None or len(self) < 2:
+            return self
+        nulls = self._null_counts(required)
+        covered = np.zeros(codes.max() + 1, dtype=bool)
+        # gains never increase, so a row whose refreshed gain still tops the heap is the best one (lazy greedy)
+        heap = [(-codes.shape[1], nulls[r], r) for r in range(len(self))]
+        heapq.heapify(heap)
+        order = list()
+        while len(heap) > 0:
+            _, null, r = heapq.heappop(heap)
+            item = (-int((~covered[codes[r]]).sum()), null, r)
+            if len(heap) > 0 and item > heap[0]:
+                heapq.heappush(heap, item)
+                continue
+            covered[codes[r]] = True
+            order.append(r)
+        return self.take(order)
+
+    def coverage_curve(self, strength: int) -> Optional[np.ndarray]:
+        """number of distinct t-way combinations covered by the first 1, 2, ... rows"""
+        codes = self.tuple_codes(strength)
+        if codes is None:
+            return None
+        _, first = np.unique(codes.ravel(), return_index=True)
+        return np.cumsum(np.bincount(first // codes.shape[1], minlength=len(self)))
+
+    def _null_counts(self, names) -> np.ndarray:
+        nulls = np.zeros(len(self), dtype=np.int64)
+        for name in names:
+            column = self._column_index.get(name)
+            if column is None:
+                continue
+            null_indexes = [i for i, v in enumerate(self.domains[column]) if v.val is None]
+            nulls += np.isin(self.matrix[:, column], null_indexes)
+        return nulls
+
+    def value(self, row: int, name: str) -> Value:
+        column = self._column_index.get(name)
+        if column is not None:
+            return self.domains[column][self.matrix[row, column]]
+        if self._history_column is not None:
+            return self.history_row(row)[name]
+        raise KeyError(name)
+
+    def history_row(self, row: int):
+        return self.history[self.domains[self._history_column][self.matrix[row, self._history_column]].val]
+
+    def names(self, row: int):
+        names = list(self._column_index.keys())
+        if self._history_column is not None:
+            names.extend(self.history_row(row).keys())
+        return names
+
+
+class CoveringArrayRow(Mapping):
+    """one row of a CoveringArray, read as Dict[str, Value]"""
+    __slots__ = ("_ca", "_row")
+
+    def __init__(self, ca: CoveringArray, row: int):
+        self._ca = ca
+        self._row = row
+
+    def __getitem__(self, name) -> Value:
+        return self._ca.value(self._row, name)
+
+    def __iter__(self):
+        return iter(self._ca.names(self._row))
+
+    def __len__(self):
+        return len(self._ca.names(self._row))
+
+    def __repr__(self):
+        return repr(dict(self.items()))
@@ -0,0 +1,101 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Iterable
+
+from loguru import logger
+
+from src.Dto.keywords import Method
+from src.Dto.operation import Operation
+
+
+class AsyncEngine:
+    """
+    runs CA.handle for several operation sequences at the same time, as tasks of one asyncio loop.
+    the state of CA is guarded by one lock that a sequence releases while it waits for the SUT (see CA._released),
+    so sequences interleave at requests like coroutines while their requests are sent concurrently.
+    sequences are only run together if the resources one of them modifies lie in subtrees the other does not touch
+    """
+
+    def __init__(self, ca, budget, concurrency=4):
+        self._ca = ca
+        self._budget = budget
+        self._concurrency = concurrency
+        self._pool = ThreadPoolExecutor(max_workers=concurrency)
+
+    @staticmethod
+    def _touched(sequence: List[Operation]) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """
+        operations read and operations modified by the sequence, as (ids, related) masks:
+        related are the operations at, above or below their paths
+        """
+        read, modified = (0, 0), (0, 0)
+        for op in sequence:
+            mask = (1 << op.id, op.ancestors | op.descendants)
+            read = (read[0] | mask[0], read[1] | mask[1])
+            if op.method is not Method.GET:
+                modified = (modified[0] | mask[0], modified[1] | mask[1])
+        return read, modified
+
+    @staticmethod
+    def _overlaps(touched: Tuple[int, int], others: Tuple[int, int]) -> bool:
+        return touched[1] & others[0] != 0
+
+    @classmethod
+    def conflicts(cls, touched, others) -> bool:
+        (paths, modified), (other_paths, other_modified) = touched, others
+        return cls._overlaps(modified, other_paths) or cls._overlaps(paths, other_modified)
+
+    async def _handle(self, sequence: List[Operation]) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._ca.handle, sequence, self._budget)
+
+    async def _run(self, sequences: Iterable[List[Operation]], fetcher: ThreadPoolExecutor):
+        # sequences are taken from the iterable as they are needed, it may block while they are generated
+        sequences = iter(sequences)
+        loop = asyncio.get_running_loop()
+        fetching = None
+        pending = list()
+        running = dict()
+        in_budget = True
+        while True:
+            if in_budget and fetching is None and sequences is not None and len(pending) < self._concurrency:
+                fetching = loop.run_in_executor(fetcher, next, sequences, None)
+            if in_budget:
+                # the first sequences that do not touch the subtrees of the running ones are started
+                for sequence in list(pending):
+                    if len(running) >= self._concurrency:
+                        break
+                    touched = self._touched(sequence)
+                    if any(self.conflicts(touched, others) for others in running.values()):
+                        continue
+                    pending.remove(sequence)
+                    running[asyncio.ensure_future(self._handle(sequence))] = touched
+            waiting = set(running.keys())
+            if in_budget and fetching is not None:
+                waiting.add(fetching)
+            if len(waiting) == 0:
+                break
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is fetching:
+                    fetching = None
+                    sequence = task.result()
+                    if sequence is None:
+                        sequences = None
+                    else:
+                        pending.append(sequence)
+                    continue
+                running.pop(task)
+                if not task.result():
+                    in_budget = False
+        if len(pending) > 0:
+            logger.info("budget is spent, {} sequences are not executed", len(pending))
+
+    def run(self, sequences: Iterable[List[Operation]]):
+        fetcher = ThreadPoolExecutor(max_workers=1)
+        try:
+            asyncio.run(self._run(sequences, fetcher))
+        finally:
+            self._pool.shutdown()
+            # a sequence still being fetched is dropped
+            fetcher.shutdown(wait=False)
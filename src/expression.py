@@ -0,0 +1,274 @@
+import abc
+import re
+from typing import Callable, List, Optional
+
+
+class Expr(metaclass=abc.ABCMeta):
+    """
+    a parsed constraint. bound expressions refer to columns of a covering array and values by index:
+    evaluate takes a row of value indexes, -1 means the column is not assigned yet,
+    and returns True/False, or None if the result depends on unassigned columns
+    """
+
+    def __init__(self):
+        self.params = set()
+
+    @abc.abstractmethod
+    def evaluate(self, row) -> Optional[bool]:
+        pass
+
+    @abc.abstractmethod
+    def toActs(self) -> str:
+        pass
+
+    @abc.abstractmethod
+    def bind(self, function: Callable) -> Optional["Expr"]:
+        """
+        a copy of the expression whose comparisons are replaced by function(comparison),
+        None if function returns None for any of them
+        """
+        pass
+
+    def __repr__(self):
+        return self.toActs()
+
+
+class Compare(Expr):
+    """left op right, a bound operand is a column index or a value index, an unbound one is the raw token"""
+
+    def __init__(self, left, op, right, leftColumn=False, rightColumn=False):
+        super().__init__()
+        if op not in _COMPARATORS:
+            raise ValueError("unexpected operator {}".format(op))
+        self.left = left
+        self.op = op
+        self.right = right
+        self.leftColumn = leftColumn
+        self.rightColumn = rightColumn
+        self._compare = _COMPARATORS[op]
+        if leftColumn:
+            self.params.add(left)
+        if rightColumn:
+            self.params.add(right)
+
+    def evaluate(self, row) -> Optional[bool]:
+        lv = row[self.left] if self.leftColumn else self.left
+        rv = row[self.right] if self.rightColumn else self.right
+        if (self.leftColumn and lv < 0) or (self.rightColumn and rv < 0):
+            return None
+        return bool(self._compare(lv, rv))
+
+    def toActs(self) -> str:
+        left = "P{}".format(self.left) if self.leftColumn else self.left
+        right = "P{}".format(self.right) if self.rightColumn else self.right
+        return "{} {} {}".format(left, self.op, right)
+
+    def bind(self, function: Callable) -> Optional[Expr]:
+        return function(self)
+
+
+class Not(Expr):
+    def __init__(self, operand: Expr):
+        super().__init__()
+        self.operand = operand
+        self.params.update(operand.params)
+
+    def evaluate(self, row) -> Optional[bool]:
+        value = self.operand.evaluate(row)
+        return None if value is None else not value
+
+    def toActs(self) -> str:
+        return "!({})".format(self.operand.toActs())
+
+    def bind(self, function: Callable) -> Optional[Expr]:
+        operand = self.operand.bind(function)
+        return None if operand is None else Not(operand)
+
+
+class And(Expr):
+    def __init__(self, operands: List[Expr]):
+        super().__init__()
+        self.operands = operands
+        for o in operands:
+            self.params.update(o.params)
+
+    def evaluate(self, row) -> Optional[bool]:
+        unknown = False
+        for o in self.operands:
+            value = o.evaluate(row)
+            if value is False:
+                return False
+            unknown = unknown or value is None
+        return None if unknown else True
+
+    def toActs(self) -> str:
+        return " && ".join(_operand(o) for o in self.operands)
+
+    def bind(self, function: Callable) -> Optional[Expr]:
+        operands = [o.bind(function) for o in self.operands]
+        return None if None in operands else And(operands)
+
+
+class Or(Expr):
+    def __init__(self, operands: List[Expr]):
+        super().__init__()
+        self.operands = operands
+        for o in operands:
+            self.params.update(o.params)
+
+    def evaluate(self, row) -> Optional[bool]:
+        unknown = False
+        for o in self.operands:
+            value = o.evaluate(row)
+            if value is True:
+                return True
+            unknown = unknown or value is None
+        return None if unknown else False
+
+    def toActs(self) -> str:
+        return " || ".join(_operand(o) for o in self.operands)
+
+    def bind(self, function: Callable) -> Optional[Expr]:
+        operands = [o.bind(function) for o in self.operands]
+        return None if None in operands else Or(operands)
+
+
+class Implies(Expr):
+    def __init__(self, left: Expr, right: Expr):
+        super().__init__()
+        self.left = left
+        self.right = right
+        self.params.update(left.params)
+        self.params.update(right.params)
+
+    def evaluate(self, row) -> Optional[bool]:
+        left = self.left.evaluate(row)
+        if left is False:
+            return True
+        right = self.right.evaluate(row)
+        if right is True:
+            return True
+        if left is True and right is False:
+            return False
+        return None
+
+    def toActs(self) -> str:
+        return "({}) => ({})".format(self.left.toActs(), self.right.toActs())
+
+    def bind(self, function: Callable) -> Optional[Expr]:
+        left = self.left.bind(function)
+        right = self.right.bind(function)
+        return None if left is None or right is None else Implies(left, right)
+
+
+_COMPARATORS = {
+    "=": lambda a, b: a == b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b,
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+}
+
+
+def _operand(expr: Expr) -> str:
+    return expr.toActs() if isinstance(expr, Compare) else "({})".format(expr.toActs())
+
+
+class ExprParser:
+    """
+    recursive descent parser of constraints in acts syntax, operands are kept as raw tokens,
+    e.g. "(AA != 'None' && BB = CC) => (DD != 'None')" for templates or "(P0 = 1) => (P2 != 3)" for acts
+    """
+    _TOKEN = re.compile(r"\s*(=>|&&|\|\||==|!=|>=|<=|=|>|<|!|\(|\)|'[^']*'|\"[^\"]*\"|-?\w+)")
+
+    def __init__(self, text: str):
+        self.text = text
+        self._tokens = self._tokenize(text)
+        self._pos = 0
+
+    def parse(self) -> Expr:
+        self._pos = 0
+        expr = self._parse_implies()
+        if self._pos != len(self._tokens):
+            raise ValueError("unexpected token {} in constraint: {}".format(self._tokens[self._pos], self.text))
+        return expr
+
+    def _tokenize(self, text):
+        tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            matcher = self._TOKEN.match(text, pos)
+            if matcher is None:
+                raise ValueError("can not parse constraint: {}".format(text))
+            tokens.append(matcher.group(1))
+            pos = matcher.end()
+        return tokens
+
+    def _peek(self):
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise ValueError("incomplete constraint: {}".format(self.text))
+        self._pos += 1
+        return token
+
+    def _parse_implies(self) -> Expr:
+        left = self._parse_or()
+        if self._peek() == "=>":
+            self._next()
+            return Implies(left, self._parse_implies())
+        return left
+
+    def _parse_or(self) -> Expr:
+        operands = [self._parse_and()]
+        while self._peek() == "||":
+            self._next()
+            operands.append(self._parse_and())
+        return operands[0] if len(operands) == 1 else Or(operands)
+
+    def _parse_and(self) -> Expr:
+        operands = [self._parse_not()]
+        while self._peek() == "&&":
+            self._next()
+            operands.append(self._parse_not())
+        return operands[0] if len(operands) == 1 else And(operands)
+
+    def _parse_not(self) -> Expr:
+        if self._peek() == "!":
+            self._next()
+            return Not(self._parse_not())
+        if self._peek() == "(":
+            self._next()
+            inner = self._parse_implies()
+            if self._next() != ")":
+                raise ValueError("missing closing ) in constraint: {}".format(self.text))
+            return inner
+        left = self._next()
+        op = self._next()
+        if op not in _COMPARATORS:
+            raise ValueError("unexpected operator {} in constraint: {}".format(op, self.text))
+        return Compare(left, op, self._next())
+
+
+def _bindActs(comparison: Compare) -> Compare:
+    def operand(token):
+        if re.fullmatch(r"P\d+", token):
+            return int(token[1:]), True
+        try:
+            return int(token), False
+        except ValueError:
+            raise ValueError("unexpected operand {} in constraint".format(token))
+
+    left, leftColumn = operand(comparison.left)
+    right, rightColumn = operand(comparison.right)
+    return Compare(left, comparison.op, right, leftColumn, rightColumn)
+
+
+def parseActs(text: str) -> Expr:
+    """a constraint in acts syntax over parameter ids, e.g. "(P0 = 1) => (P2 != 3)", bound to column indexes"""
+    return ExprParser(text).parse().bind(_bindActs)
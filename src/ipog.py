@@ -0,0 +1,253 @@
+import time
+from itertools import combinations, product
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from src.expression import Expr, parseActs
+
+
+class ConstraintSolver:
+    """checks whether a partial row can be completed without violating any constraint"""
+
+    def __init__(self, sizes: Sequence[int], constraints: Sequence[Expr]):
+        self._sizes = list(sizes)
+        self._constraints = list(constraints)
+        self.columns = sorted({c for e in self._constraints for c in e.params})
+        self._cache = dict()
+
+    def involves(self, columns) -> bool:
+        return len(self._constraints) > 0 and any(c in self.columns for c in columns)
+
+    def is_satisfiable(self, row) -> bool:
+        if len(self._constraints) == 0:
+            return True
+        key = tuple(int(row[c]) for c in self.columns)
+        if key not in self._cache:
+            self._cache[key] = self._search([int(v) for v in row], None)
+        return self._cache[key]
+
+    def complete(self, row, rng: np.random.Generator):
+        """assign every -1 in the row in place, constrained columns are searched, others are random"""
+        if len(self._constraints) > 0:
+            values = [int(v) for v in row]
+            if not self._search(values, rng):
+                raise ValueError("row can not be completed under constraints")
+            row[:] = values
+        for c in np.flatnonzero(row < 0):
+            row[c] = rng.integers(self._sizes[c])
+
+    def _search(self, row: List[int], rng: Optional[np.random.Generator]) -> bool:
+        verdicts = [e.evaluate(row) for e in self._constraints]
+        if False in verdicts:
+            return False
+        if None not in verdicts:
+            return True
+        undecided = self._constraints[verdicts.index(None)]
+        column = next(c for c in sorted(undecided.params) if row[c] < 0)
+        values = range(self._sizes[column]) if rng is None else rng.permutation(self._sizes[column])
+        for v in values:
+            row[column] = int(v)
+            if self._search(row, rng):
+                return True
+        row[column] = -1
+        return False
+
+
+class IPOG:
+    """
+    in-process IPOG covering array generator, works on value indexes only:
+    column i of the result takes values in range(sizes[i]).
+    generate raises TimeoutError once time_budget seconds are spent, unlimited if None
+    """
+
+    def __init__(self, sizes: Sequence[int], strength: int, constraints: Sequence[Union[str, Expr]] = (), seed=None,
+                 time_budget=None):
+        self._sizes = np.asarray(sizes, dtype=np.int64)
+        self._strength = max(1, min(strength, len(sizes)))
+        # constraints are bound expressions over column indexes, or texts in acts syntax over parameter ids
+        constraints = [parseActs(c) if isinstance(c, str) else c for c in constraints]
+        self._solver = ConstraintSolver(sizes, constraints)
+        self._rng = np.random.default_rng(seed)
+
+        # acts also extends parameters with larger domains first
+        self._order = sorted(range(len(sizes)), key=lambda i: -sizes[i])
+        self._rows = np.full((16, len(sizes)), -1, dtype=np.int32)
+        self._size = 0
+        self._time_budget = time_budget
+        self._deadline = None
+
+    def _check_deadline(self):
+        if self._deadline is not None and time.time() > self._deadline:
+            raise TimeoutError("ipog did not finish in {} seconds".format(self._time_budget))
+
+    def generate(self) -> np.ndarray:
+        if len(self._sizes) == 0:
+            return np.zeros((1, 0), dtype=np.int32)
+        if self._time_budget is not None:
+            self._deadline = time.time() + self._time_budget
+
+        t = self._strength
+        first = self._order[:t]
+        for values in product(*[range(self._sizes[c]) for c in first]):
+            self._check_deadline()
+            row = np.full(len(self._sizes), -1, dtype=np.int32)
+            row[first] = values
+            if self._solver.is_satisfiable(row):
+                self._append(row)
+
+        for k in range(t, len(self._order)):
+            self._extend(self._order[:k], self._order[k])
+
+        rows = self._rows[:self._size]
+        for row in rows:
+            if (row < 0).any():
+                self._solver.complete(row, self._rng)
+        return rows.copy()
+
+    def _append(self, row):
+        if self._size == len(self._rows):
+            self._rows = np.vstack([self._rows, np.full_like(self._rows, -1)])
+        self._rows[self._size] = row
+        self._size += 1
+        return self._size - 1
+
+    def _extend(self, previous: List[int], column: int):
+        sizes = self._sizes
+        width = int(sizes[column])
+        combos = np.array(list(combinations(previous, self._strength - 1)), dtype=np.int64)
+        # flat index of tuple (v_1, ..., v_t-1, v) in combo k: offsets[k] + sum(v_j * strides[k, j]) + v
+        strides = np.ones_like(combos) * width
+        for j in range(combos.shape[1] - 2, -1, -1):
+            strides[:, j] = strides[:, j + 1] * sizes[combos[:, j + 1]]
+        lengths = (strides[:, 0] * sizes[combos[:, 0]]) if combos.shape[1] > 0 else np.full(len(combos), width)
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+        uncovered = np.ones(int(lengths.sum()), dtype=bool)
+        for k, combo in enumerate(combos):
+            if self._solver.involves(list(combo) + [column]):
+                self._exclude_invalid(uncovered, offsets[k], list(combo) + [column])
+
+        arange = np.arange(width)
+
+        def tuple_bases(row):
+            assigned = row[combos]
+            valid = (assigned >= 0).all(axis=1)
+            return offsets[valid] + (assigned[valid] * strides[valid]).sum(axis=1)
+
+        # horizontal growth
+        for r in range(self._size):
+            self._check_deadline()
+            row = self._rows[r]
+            bases = tuple_bases(row)
+            gains = uncovered[bases[:, None] + arange].sum(axis=0)
+            if gains.max() == 0:
+                continue
+            for v in np.argsort(-gains, kind="stable"):
+                if gains[v] == 0:
+                    break
+                row[column] = v
+                if not self._solver.involves([column]) or self._solver.is_satisfiable(row):
+                    uncovered[bases + v] = False
+                    break
+                row[column] = -1
+
+        # vertical growth
+        for index in np.flatnonzero(uncovered):
+            if not uncovered[index]:
+                continue
+            self._check_deadline()
+            k = int(np.searchsorted(offsets, index, side="right")) - 1
+            local = int(index - offsets[k])
+            columns = list(combos[k]) + [column]
+            values = [local // int(s) % int(sizes[c]) for s, c in zip(strides[k], combos[k])] + [local % width]
+
+            placed = None
+            current = self._rows[:self._size, columns]
+            matches = ((current == values) | (current < 0)).all(axis=1)
+            for r in np.flatnonzero(matches):
+                candidate = self._rows[r].copy()
+                candidate[columns] = values
+                if self._solver.is_satisfiable(candidate):
+                    self._rows[r] = candidate
+                    placed = r
+                    break
+            if placed is None:
+                row = np.full(len(sizes), -1, dtype=np.int32)
+                row[columns] = values
+                placed = self._append(row)
+
+            row = self._rows[placed]
+            uncovered[tuple_bases(row) + row[column]] = False
+
+    def _exclude_invalid(self, uncovered, offset, columns):
+        """tuples that can not appear in any valid row need not be covered"""
+        row = np.full(len(self._sizes), -1, dtype=np.int32)
+        for i, values in enumerate(product(*[range(self._sizes[c]) for c in columns])):
+            self._check_deadline()
+            row[columns] = values
+            if not self._solver.is_satisfiable(row):
+                uncovered[offset + i] = False
+
+
+class GreedySampler:
+    """
+    bounded-time replacement of IPOG for models that can not be solved in time: candidate rows are drawn at random
+    (completed under the constraints) and the one covering most uncovered t-way tuples is kept, as in AETG.
+    sampling stops when no candidate adds coverage for a while, or when the time budget is spent
+    """
+
+    def __init__(self, sizes: Sequence[int], strength: int, constraints: Sequence[Union[str, Expr]] = (),
+                 seed=None, time_budget=2.0, candidates=20, patience=3, max_tuples=20_000_000, max_rows=1000):
+        self._sizes = np.asarray(sizes, dtype=np.int64)
+        self._strength = max(1, min(strength, len(sizes)))
+        constraints = [parseActs(c) if isinstance(c, str) else c for c in constraints]
+        self._solver = ConstraintSolver(sizes, constraints)
+        self._rng = np.random.default_rng(seed)
+        self._time_budget = time_budget
+        self._candidates = candidates
+        self._patience = patience
+        self._max_tuples = max_tuples
+        self._max_rows = max_rows
+
+    def generate(self) -> np.ndarray:
+        if len(self._sizes) == 0:
+            return np.zeros((1, 0), dtype=np.int32)
+
+        deadline = time.time() + self._time_budget
+        combos = np.array(list(combinations(range(len(self._sizes)), self._strength)), dtype=np.int64)
+        # flat index of a tuple: offsets[k] + sum(row[combos[k, j]] * strides[k, j])
+        strides = np.ones_like(combos)
+        for j in range(combos.shape[1] - 2, -1, -1):
+            strides[:, j] = strides[:, j + 1] * self._sizes[combos[:, j + 1]]
+        lengths = strides[:, 0] * self._sizes[combos[:, 0]]
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        # too many tuples to track, keep random rows only
+        uncovered = np.ones(int(lengths.sum()), dtype=bool) if lengths.sum() <= self._max_tuples else None
+
+        rows = [self._draw()]
+        idle = 0
+        if uncovered is not None:
+            uncovered[offsets + (rows[0][combos] * strides).sum(axis=1)] = False
+        while time.time() < deadline and idle < self._patience and len(rows) < self._max_rows:
+            if uncovered is None:
+                rows.append(self._draw())
+                # as many rows as the largest t-way domain product, the size of a covering array at best
+                idle = self._patience if len(rows) >= lengths.max() else 0
+                continue
+            candidates = np.array([self._draw() for _ in range(self._candidates)])
+            indexes = offsets + (candidates[:, combos] * strides).sum(axis=2)
+            gains = uncovered[indexes].sum(axis=1)
+            best = int(np.argmax(gains))
+            if gains[best] == 0:
+                idle += 1
+                continue
+            idle = 0
+            rows.append(candidates[best])
+            uncovered[indexes[best]] = False
+        return np.array(rows, dtype=np.int32)
+
+    def _draw(self) -> np.ndarray:
+        row = np.full(len(self._sizes), -1, dtype=np.int32)
+        self._solver.complete(row, self._rng)
+        return row
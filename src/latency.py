@@ -0,0 +1,141 @@
+import bisect
+import threading
+from typing import Dict, List, Optional
+
+
+class P2Quantile:
+    """streaming estimate of one quantile in constant memory, the P-square algorithm of Jain and Chlamtac"""
+
+    def __init__(self, p):
+        self.p = p
+        self.count = 0
+        # heights and positions of the five markers: min, p/2, p, (1+p)/2, max
+        self._q: List[float] = []
+        self._n = [0, 1, 2, 3, 4]
+        self._desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: float):
+        self.count += 1
+        if self.count <= 5:
+            bisect.insort(self._q, x)
+            return
+
+        q, n = self._q, self._n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = bisect.bisect_right(q, x) - 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in range(1, 4):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def _parabolic(self, i, d) -> float:
+        q, n = self._q, self._n
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+                (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def value(self) -> Optional[float]:
+        if self.count == 0:
+            return None
+        if self.count * (1 - self.p) < 1:
+            # too few observations to tell the quantile apart from the maximum
+            return self._q[-1]
+        if self.count <= 5:
+            return self._q[int(round(self.p * (self.count - 1)))]
+        return self._q[2]
+
+
+class OperationLatency:
+    def __init__(self):
+        self.p50 = P2Quantile(0.5)
+        self.p99 = P2Quantile(0.99)
+        self.requests = 0
+        self.timeouts = 0
+        # timeouts since the last response, the operation is demoted when they pile up
+        self.consecutive_timeouts = 0
+
+    def add(self, seconds):
+        self.p50.add(seconds)
+        self.p99.add(seconds)
+
+
+class LatencyTracker:
+    """
+    latency of every operation, the timeout of a request is factor * p99 of its operation clamped to [floor, ceiling]
+    (ceiling until warmup responses are seen). a timeout counts as a latency of the timeout itself,
+    so the timeout of an operation that is slow but alive grows back towards the ceiling
+    """
+
+    def __init__(self, floor=50.0, ceiling=50.0, factor=3.0, warmup=5, demote_after=3):
+        self.floor = min(floor, ceiling)
+        self.ceiling = ceiling
+        self._factor = factor
+        self._warmup = warmup
+        # consecutive timeouts after which an operation is demoted, never if 0
+        self._demote_after = demote_after
+        self._latencies: Dict[object, OperationLatency] = dict()
+        self._lock = threading.Lock()
+
+    def _get(self, operation) -> OperationLatency:
+        if operation not in self._latencies:
+            self._latencies[operation] = OperationLatency()
+        return self._latencies[operation]
+
+    def _timeout(self, latency: OperationLatency) -> float:
+        if latency.requests < self._warmup:
+            return self.ceiling
+        return min(self.ceiling, max(self.floor, self._factor * latency.p99.value()))
+
+    def timeout(self, operation) -> float:
+        with self._lock:
+            return self._timeout(self._get(operation))
+
+    def observe(self, operation, seconds):
+        with self._lock:
+            latency = self._get(operation)
+            latency.requests += 1
+            latency.consecutive_timeouts = 0
+            latency.add(seconds)
+
+    def timed_out(self, operation, seconds):
+        with self._lock:
+            latency = self._get(operation)
+            latency.requests += 1
+            latency.timeouts += 1
+            latency.consecutive_timeouts += 1
+            latency.add(seconds)
+
+    def demoted(self, operation) -> bool:
+        """an operation that keeps timing out only gets one request per covering array, until it responds again"""
+        if self._demote_after <= 0:
+            return False
+        with self._lock:
+            latency = self._latencies.get(operation)
+            return latency is not None and latency.consecutive_timeouts >= self._demote_after
+
+    def report(self) -> List[tuple]:
+        """(operation, requests, timeouts, p50, p99, timeout, demoted) of every operation"""
+        rows = list()
+        with self._lock:
+            for operation, latency in self._latencies.items():
+                rows.append((operation.__repr__(), latency.requests, latency.timeouts, latency.p50.value(),
+                             latency.p99.value(), self._timeout(latency),
+                             0 < self._demote_after <= latency.consecutive_timeouts))
+        return rows
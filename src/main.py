@@ -42,6 +42,79 @@ class Config:
         # acts jar file
         self.jar = ""
 
+        # covering array generator: acts (jar) or ipog (in-process)
+        self.generator = "acts"
+
+        # keep one acts jvm alive for the whole run
+        self.acts_worker = False
+
+        # timeout of one acts call (secs)
+        self.acts_timeout = 60
+
+        # number of covering arrays generated concurrently
+        self.ca_workers = 2
+
+        # connections kept alive per host of the SUT
+        self.pool_size = 10
+
+        # rows of an operation sent at the same time
+        self.max_in_flight = 1
+
+        # sequences run at the same time by the asyncio engine
+        self.parallel_seqs = 1
+
+        # sequences built ahead of the execution, all of them are built first if 0
+        self.stream_size = 0
+
+        # requests sent to one host at the same time, unlimited if 0
+        self.per_host = 0
+
+        # ceiling of requests per second, unlimited if 0
+        self.rate_limit = 0
+
+        # bounds of the timeout of a request, derived from the latency of its operation
+        # (the fixed timeout of 50 secs if they are equal, so timeouts only adapt if the floor is lowered)
+        self.timeout_floor = 50
+        self.timeout_ceiling = 50
+
+        # consecutive timeouts after which an operation is demoted, never if 0
+        self.demote_after = 3
+
+        # bytes of a response body read at most, unlimited if 0
+        self.max_body = 1024 * 1024
+
+        # bodies of at least these bytes are scanned instead of decoded, never if 0
+        self.scan_from = 64 * 1024
+
+        # consecutive unreachable requests after which testing is paused, never if 0,
+        # and the longest outage waited for
+        self.breaker_threshold = 5
+        self.max_outage = 600
+
+        # secs to wait for a covering array before sampling one instead, None waits until it is generated
+        self.ca_timeout = 30
+
+        # time budget of sampling (secs)
+        self.fallback_time = 2
+
+        # drop redundant rows of generated covering arrays
+        self.minimize = False
+
+        # send the rows covering the most new combinations first
+        self.order_rows = False
+
+        # number of upcoming operations whose covering arrays are generated in advance
+        self.prefetch = 1
+
+        # generate the all-parameter covering array while the essential cases are sent
+        self.speculate_all = False
+
+        # folder of cached covering arrays, None if the cache is disabled
+        self.cache_dir = None
+
+        # size cap of the cache folder (bytes)
+        self.cache_size = 64 * 1024 * 1024
+
         # auth token
         self.header = dict()
 
@@ -113,15 +186,115 @@ class Config:
         else:
             raise Exception("patterns are not provided")
 
+        self.generator = settings.generator
+        self.acts_worker = settings.actsWorker
+
+        if settings.actsTimeout <= 0:
+            raise Exception("acts timeout must be positive")
+        else:
+            self.acts_timeout = settings.actsTimeout
+
         if settings.jar == "":
             jarFile = curFile.parent.parent / "lib/acts_2.93.jar"
         else:
             jarFile = Path(settings.jar)
         if jarFile.exists() and jarFile.is_file():
             self.jar = jarFile.as_posix()
-        else:
+        elif self.generator == "acts":
             raise Exception("acts jar is not provided")
 
+        if settings.caWorkers <= 0:
+            raise Exception("number of covering array workers must be positive")
+        else:
+            self.ca_workers = settings.caWorkers
+
+        if settings.poolSize <= 0:
+            raise Exception("connection pool size must be positive")
+        else:
+            self.pool_size = settings.poolSize
+
+        if settings.maxInFlight <= 0:
+            raise Exception("max in flight requests must be positive")
+        else:
+            self.max_in_flight = settings.maxInFlight
+
+        if settings.parallelSeqs <= 0:
+            raise Exception("number of parallel sequences must be positive")
+        else:
+            self.parallel_seqs = settings.parallelSeqs
+
+        if settings.streamSize < 0:
+            raise Exception("size of the sequence stream cannot be negative")
+        else:
+            self.stream_size = settings.streamSize
+
+        if settings.perHost < 0:
+            raise Exception("requests per host cannot be negative")
+        else:
+            self.per_host = settings.perHost
+
+        if settings.rateLimit < 0:
+            raise Exception("rate limit cannot be negative")
+        else:
+            self.rate_limit = settings.rateLimit
+
+        if settings.timeoutFloor <= 0 or settings.timeoutCeiling < settings.timeoutFloor:
+            raise Exception("request timeouts should satisfy 0 < floor <= ceiling")
+        else:
+            self.timeout_floor = settings.timeoutFloor
+            self.timeout_ceiling = settings.timeoutCeiling
+
+        if settings.demoteAfter < 0:
+            raise Exception("demote after cannot be negative")
+        else:
+            self.demote_after = settings.demoteAfter
+
+        if settings.maxBody < 0:
+            raise Exception("max body cannot be negative")
+        else:
+            self.max_body = settings.maxBody * 1024
+
+        if settings.scanFrom < 0:
+            raise Exception("scan from cannot be negative")
+        else:
+            self.scan_from = settings.scanFrom * 1024
+
+        if settings.breakerThreshold < 0:
+            raise Exception("breaker threshold cannot be negative")
+        else:
+            self.breaker_threshold = settings.breakerThreshold
+
+        if settings.maxOutage < 0:
+            raise Exception("max outage cannot be negative")
+        else:
+            self.max_outage = settings.maxOutage
+
+        if settings.caTimeout < 0:
+            raise Exception("covering array timeout cannot be negative")
+        else:
+            self.ca_timeout = settings.caTimeout if settings.caTimeout > 0 else None
+
+        if settings.fallbackTime <= 0:
+            raise Exception("fallback time must be positive")
+        else:
+            self.fallback_time = settings.fallbackTime
+
+        self.minimize = settings.minimize
+        self.order_rows = settings.orderRows
+
+        if settings.prefetch < 0:
+            raise Exception("prefetch depth cannot be negative")
+        else:
+            self.prefetch = settings.prefetch
+
+        self.speculate_all = settings.speculateAll
+
+        if settings.cacheSize < 0:
+            raise Exception("cache size cannot be negative")
+        elif settings.cacheSize > 0:
+            self.cache_size = settings.cacheSize * 1024 * 1024
+            self.cache_dir = (folder / "ca_cache").as_posix() if settings.cacheDir == "" else settings.cacheDir
+
         try:
             authToken = json.loads(settings.header)
         except json.JSONDecodeError:
@@ -158,6 +331,9 @@ class Config:
         if self.workflow_url is None and self.forwarding_url is not None:
             raise Exception(f"forwarding url is set with {self.forwarding_url}, but workflow controller url is not set")
 
+        if self.workflow_url is not None and self.parallel_seqs > 1:
+            raise Exception("test cases of the workflow controller can not be registered for parallel sequences")
+
         os.environ["dataPath"] = self.dataPath
         os.environ["swagger"] = self.swagger
         os.environ["patternFile"] = self.patterns
@@ -197,6 +373,90 @@ if __name__ == "__main__":
     parser.add_argument('--jar',
                         help='acts jar file',
                         type=str, required=False, default="")
+    parser.add_argument('--generator',
+                        help='covering array generator, acts or ipog',
+                        type=str, required=False, default="acts", choices=["acts", "ipog"])
+    parser.add_argument('--actsWorker',
+                        help='keep one acts process alive instead of starting java for every covering array',
+                        action='store_true')
+    parser.add_argument('--actsTimeout',
+                        help='timeout of one acts call(Secs), default=60',
+                        type=int, required=False, default=60)
+    parser.add_argument('--caWorkers',
+                        help='number of covering arrays generated concurrently, default=2',
+                        type=int, required=False, default=2)
+    parser.add_argument('--poolSize',
+                        help='connections kept alive per host of the SUT, default=10',
+                        type=int, required=False, default=10)
+    parser.add_argument('--maxInFlight',
+                        help='rows of a covering array sent at the same time, default=1',
+                        type=int, required=False, default=1)
+    parser.add_argument('--parallelSeqs',
+                        help='operation sequences run at the same time by the asyncio engine, default=1',
+                        type=int, required=False, default=1)
+    parser.add_argument('--streamSize',
+                        help='operation sequences built ahead of the execution while the earlier ones are sent, 0 '
+                             'builds all sequences before sending requests, default=0',
+                        type=int, required=False, default=0)
+    parser.add_argument('--perHost',
+                        help='requests sent to one host at the same time, 0 is unlimited, default=0',
+                        type=int, required=False, default=0)
+    parser.add_argument('--rateLimit',
+                        help='ceiling of requests per second, lowered while the SUT throttles, 0 is unlimited, '
+                             'default=0',
+                        type=float, required=False, default=0)
+    parser.add_argument('--timeoutFloor',
+                        help='lower bound of request timeouts (seconds), timeouts adapt to the latency of operations '
+                             'if it is below the ceiling, default=50',
+                        type=float, required=False, default=50)
+    parser.add_argument('--timeoutCeiling',
+                        help='upper bound of request timeouts (seconds), default=50',
+                        type=float, required=False, default=50)
+    parser.add_argument('--demoteAfter',
+                        help='consecutive timeouts after which an operation only gets one request per covering array, '
+                             '0 never demotes, default=3',
+                        type=int, required=False, default=3)
+    parser.add_argument('--maxBody',
+                        help='size of a response body read at most (KB), the rest is skipped, 0 is unlimited, '
+                             'default=1024',
+                        type=int, required=False, default=1024)
+    parser.add_argument('--scanFrom',
+                        help='size of response bodies (KB) from which ids and dynamic values are scanned out of the '
+                             'json text instead of decoding the whole body, 0 never scans, default=64',
+                        type=int, required=False, default=64)
+    parser.add_argument('--breakerThreshold',
+                        help='consecutive connection errors or timeouts after which testing is paused until the SUT '
+                             'responds again, 0 never pauses, default=5',
+                        type=int, required=False, default=5)
+    parser.add_argument('--maxOutage',
+                        help='longest outage of the SUT waited for before testing is stopped (seconds), default=600',
+                        type=float, required=False, default=600)
+    parser.add_argument('--caTimeout',
+                        help='secs to wait for a covering array before sampling one instead, 0 waits until it is '
+                             'generated, default=30',
+                        type=float, required=False, default=30)
+    parser.add_argument('--fallbackTime',
+                        help='time budget of sampling a covering array(Secs), default=2',
+                        type=float, required=False, default=2)
+    parser.add_argument('--minimize',
+                        help='drop rows of covering arrays whose t-way combinations are covered by other rows',
+                        action='store_true')
+    parser.add_argument('--orderRows',
+                        help='send the rows of covering arrays that cover the most new combinations first',
+                        action='store_true')
+    parser.add_argument('--prefetch',
+                        help='number of upcoming operations whose covering arrays are generated in advance, default=1',
+                        type=int, required=False, default=1)
+    parser.add_argument('--speculateAll',
+                        help='generate the all-parameter covering array while the essential cases are sent, it is '
+                             'thrown away if any essential case succeeds',
+                        action='store_true')
+    parser.add_argument('--cacheDir',
+                        help='folder of cached covering arrays, default=<dir>/ca_cache',
+                        type=str, required=False, default="")
+    parser.add_argument('--cacheSize',
+                        help='size cap of cached covering arrays(MB), 0 disables the cache, default=64',
+                        type=int, required=False, default=64)
     parser.add_argument('--header',
                         help='auth token: {keyName: token}',
                         type=str, required=False, default="{}")
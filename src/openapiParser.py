@@ -4,7 +4,7 @@ from pathlib import Path
 from urllib.parse import urlparse
 
 from src.Dto.keywords import DocKey, ParamKey, DataType, Method
-from src.Dto.operation import Operation
+from src.Dto.operation import Operation, PathTrie
 from src.Dto.operation import Response
 from src.Dto.parameter import buildParam, Example
 
@@ -43,6 +43,7 @@ class Parser:
         paths = spec.get(DocKey.PATHS, {})
         if len(paths) > 0:
             self._parse_paths(paths)
+        PathTrie(self.operations)
 
         # parse definitions
         self._parse_definition_example()
@@ -78,6 +79,7 @@ class Parser:
                 header = method_info.get("consumes")
                 operation = Operation(self._host, self._path.rstrip("/") + "/" + url_str.lstrip("/"), method_name,
                                       header)
+                operation.id = len(self.operations)
                 self.operations.append(operation)
                 # process parameters
                 paramList = method_info.get(DocKey.PARAMS, [])
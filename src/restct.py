@@ -7,8 +7,9 @@ from loguru import logger
 from src.Dto.parameter import Example
 from src.ca import CA
 from src.controller import RemoteController
+from src.engine import AsyncEngine
 from src.openapiParser import Parser
-from src.sca import SCA
+from src.sca import SCA, SequenceStream
 from src.statistics import Statistics
 
 
@@ -39,6 +40,29 @@ class RestCT:
                       self._config.s_strength,
                       query_auth=self._config.query,
                       header_auth=self._config.header,
+                      pool_size=self._config.pool_size,
+                      max_in_flight=self._config.max_in_flight,
+                      per_host=self._config.per_host,
+                      rate_limit=self._config.rate_limit,
+                      timeout_floor=self._config.timeout_floor,
+                      timeout_ceiling=self._config.timeout_ceiling,
+                      demote_after=self._config.demote_after,
+                      max_body=self._config.max_body,
+                      scan_from=self._config.scan_from,
+                      breaker_threshold=self._config.breaker_threshold,
+                      max_outage=self._config.max_outage,
+                      generator=self._config.generator,
+                      acts_worker=self._config.acts_worker,
+                      acts_timeout=self._config.acts_timeout,
+                      ca_workers=self._config.ca_workers,
+                      ca_timeout=self._config.ca_timeout,
+                      fallback_time=self._config.fallback_time,
+                      prefetch=self._config.prefetch,
+                      speculate_all=self._config.speculate_all,
+                      minimize=self._config.minimize,
+                      order_rows=self._config.order_rows,
+                      cache_dir=self._config.cache_dir,
+                      cache_size=self._config.cache_size,
                       stat=self._statistics)
 
     def _update_log_config(self):
@@ -62,18 +86,33 @@ class RestCT:
         self._logger.info("operations: {}".format(len(self._operations)))
         self._logger.info("examples found: {}".format(len(Example.members)))
 
-        sequences = []
-        while not self._sca.is_all_covered():
-            sequences.append(self._sca.build_one_sequence())
-            self._statistics.dump_snapshot()
-
-        for sequence in sorted(sequences, key=lambda s: len(s)):
-            self._before_testcase()
-            flag = self._ca.handle(sequence, self._config.budget)
-            self._after_testcase()
-
-            if not flag:
-                break
-
+        stream = None
+        if self._config.stream_size > 0:
+            # sequences are executed while the next ones are built
+            stream = SequenceStream(self._sca, self._config.stream_size).start()
+            sequences = stream
+        else:
+            sequences = []
+            while not self._sca.is_all_covered():
+                sequences.append(self._sca.build_one_sequence())
+                self._statistics.dump_snapshot()
+            sequences = sorted(sequences, key=lambda s: len(s))
+
+        try:
+            if self._config.parallel_seqs > 1:
+                AsyncEngine(self._ca, self._config.budget, self._config.parallel_seqs).run(sequences)
+            else:
+                for sequence in sequences:
+                    self._before_testcase()
+                    flag = self._ca.handle(sequence, self._config.budget)
+                    self._after_testcase()
+
+                    if not flag:
+                        break
+        finally:
+            if stream is not None:
+                stream.close()
+
+        self._ca.close()
         # self._statistics.stop_test()
         self._statistics.write_report()
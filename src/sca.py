@@ -1,7 +1,10 @@
-from itertools import permutations, combinations
+import queue
+import threading
+from itertools import combinations, count
 from random import choice
-from typing import List, Set
+from typing import List, Dict, Iterator, Tuple
 
+import numpy as np
 from loguru import logger
 
 from src.Dto.keywords import Method
@@ -14,7 +17,7 @@ class SemanticValidator:
     @staticmethod
     def _validate_post(post: Operation, seq_before: List[Operation]):
         for pre in seq_before:
-            if post.path.is_ancestor_of(pre.path):
+            if post.descendants >> pre.id & 1:
                 return False
 
         return True
@@ -22,7 +25,7 @@ class SemanticValidator:
     @staticmethod
     def _validate_delete(delete: Operation, seq_after: List[Operation]):
         for aft in seq_after:
-            if delete.path.is_ancestor_of(aft.path):
+            if delete.descendants >> aft.id & 1:
                 return False
 
         return True
@@ -37,23 +40,145 @@ class SemanticValidator:
                 return False
         return True
 
+    @staticmethod
+    def successors(operations: List[Operation]) -> Dict[int, int]:
+        """
+        the mask of the ids of the operations that can come anywhere after each operation (by id):
+        is_valid only rejects pairs, a post after an operation under it or a delete before an operation under it
+        """
+        allowed, posts = 0, 0
+        for op in operations:
+            allowed |= 1 << op.id
+            if op.method is Method.POST:
+                posts |= 1 << op.id
+        masks = dict()
+        for before in operations:
+            rejected = (1 << before.id) | (before.ancestors & posts)
+            if before.method is Method.DELETE:
+                rejected |= before.descendants
+            masks[before.id] = allowed & ~rejected
+        return masks
+
+    @staticmethod
+    def valid_prefixes(operations: List[Operation], size, radix) -> Iterator[Tuple[int, int]]:
+        """
+        (code, mask) of the valid permutations of size operations that is_valid would keep, found depth first:
+        code is the mixed-radix code of their ids, mask the ids that can follow them.
+        a prefix is only extended by operations allowed after all of its members, those that cannot be extended up to
+        size are pruned, so that only valid prefixes are visited
+        """
+        successors = SemanticValidator.successors(operations)
+        allowed = 0
+        for op in operations:
+            allowed |= 1 << op.id
+
+        def extend(code, allowed, depth):
+            if depth >= size:
+                yield code, allowed
+                return
+            rest = allowed
+            while rest:
+                low = rest & -rest
+                rest ^= low
+                i = low.bit_length() - 1
+                following = allowed & successors[i]
+                if following:
+                    yield from extend(code * radix + i, following, depth + 1)
+
+        return extend(0, allowed, 0)
+
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int32)
+
+
+class PermutationBitset:
+    """
+    a set of t-way permutations of operation ids, one bit each:
+    (o_1, ..., o_t) is the bit o_t of the row o_1 * n^(t-2) + ... + o_(t-1), i.e. rows are the mixed-radix codes of
+    the (t-1)-prefixes
+    """
+
+    def __init__(self, n, strength):
+        self.rows = n ** max(strength - 1, 0)
+        self.width = (n + 7) // 8
+        self._bits = np.zeros((self.rows, self.width), dtype=np.uint8)
+        self.count = 0
+
+    def fill(self, rows, bits):
+        """set whole rows, which are distinct, to the bits of bytes (little-endian) of width"""
+        self._bits[rows] = np.frombuffer(bits, dtype=np.uint8).reshape(len(rows), self.width)
+        self.count = int(self.row_counts().sum())
+
+    def _locate(self, rows, cols):
+        return (rows, cols >> 3), np.left_shift(1, cols & 7).astype(np.uint8)
+
+    def contains(self, rows, cols):
+        index, mask = self._locate(rows, cols)
+        return (self._bits[index] & mask) != 0
+
+    def add(self, rows, cols):
+        """add the permutations, which are distinct, and return the mask of those that were not in the set"""
+        index, mask = self._locate(rows, cols)
+        added = (self._bits[index] & mask) == 0
+        np.bitwise_or.at(self._bits, (index[0][added], index[1][added]), mask[added])
+        self.count += int(added.sum())
+        return added
+
+    def discard(self, rows, cols):
+        """remove the permutations, which are distinct, and return the mask of those that were in the set"""
+        index, mask = self._locate(rows, cols)
+        removed = (self._bits[index] & mask) != 0
+        np.bitwise_and.at(self._bits, (index[0][removed], index[1][removed]), ~mask[removed])
+        self.count -= int(removed.sum())
+        return removed
+
+    def row_counts(self):
+        return _POPCOUNT[self._bits].sum(axis=1, dtype=np.int64)
+
 
 class SCA:
     def __init__(self, strength, operations, stat):
         self._strength = min(strength, len(operations))
-        self._operations: Set[Operation] = operations
+        self._operations: List[Operation] = operations
         self._stat = stat
 
+        # permutations are coded by the dense ids of their operations
+        self._n = max(op.id for op in operations) + 1 if len(operations) > 0 else 1
         self._uncovered = self._compute_all_combinations()
-        self._stat.t_way_to_covered = len(self._uncovered)
+        self._covered = PermutationBitset(self._n, self._strength)
+        self._stat.t_way_to_covered = self._uncovered.count
+
+        # number of uncovered permutations starting with each proper prefix, indexed by the size and the code of the
+        # prefix, kept in step with self._uncovered
+        self._prefix_counts: List[np.ndarray] = [np.zeros(1, dtype=np.int64)] * self._strength
+        if self._strength > 1:
+            self._prefix_counts[-1] = self._uncovered.row_counts()
+            for size in range(self._strength - 2, 0, -1):
+                self._prefix_counts[size] = self._prefix_counts[size + 1].reshape(-1, self._n).sum(axis=1)
 
     def _compute_all_combinations(self):
-        cover = set()
-        for p in permutations(self._operations, self._strength):
-            if SemanticValidator.is_valid(p):
-                cover.add(p)
+        cover = PermutationBitset(self._n, self._strength)
+        # a row of the bitset is the mask of the operations that can follow a valid (t-1)-prefix, so the last
+        # operation of a permutation is never enumerated
+        rows = list()
+        bits = bytearray()
+        for code, mask in SemanticValidator.valid_prefixes(self._operations, self._strength - 1, self._n):
+            rows.append(code)
+            bits += mask.to_bytes(cover.width, "little")
+        cover.fill(np.asarray(rows, dtype=np.int64), bytes(bits))
         return cover
 
+    def _encode(self, ids: np.ndarray):
+        """mixed-radix codes of the rows of ids"""
+        codes = np.zeros(len(ids), dtype=np.int64)
+        for k in range(ids.shape[1]):
+            codes = codes * self._n + ids[:, k]
+        return codes
+
+    def _split(self, ids: np.ndarray):
+        """(row, bit) of the permutations in the rows of ids"""
+        return self._encode(ids[:, :-1]), ids[:, -1]
+
     def build_one_sequence(self):
         seq: List[Operation] = list()
 
@@ -80,7 +205,7 @@ class SCA:
 
         self._update_uncovered(seq)
         logger.info(
-            "uncovered combinations: {}, sequence length: {}".format(len(self._uncovered), len(seq)))
+            "uncovered combinations: {}, sequence length: {}".format(self._uncovered.count, len(seq)))
 
         self._stat.seq_all_num += 1
         self._stat.sum_len_of_all_seq += len(seq)
@@ -88,16 +213,25 @@ class SCA:
         return seq
 
     def _update_uncovered(self, sequence: List[Operation]):
-        covered = set(combinations(sequence, self._strength))
-        self._uncovered -= covered
-        self._stat.t_way_covered.update(covered)
+        if len(sequence) < self._strength:
+            return
+        covered = np.asarray(list(combinations([op.id for op in sequence], self._strength)), dtype=np.int64)
+        rows, cols = self._split(covered)
+        removed = covered[self._uncovered.discard(rows, cols)]
+        for size in range(1, self._strength):
+            np.subtract.at(self._prefix_counts[size], self._encode(removed[:, :size]), 1)
+        self._covered.add(rows, cols)
+        self._stat.t_way_covered = self._covered.count
 
     def _retrieve_dependent_ops(self, op: Operation, seq: List[Operation]):
         result: List[Operation] = []
+        used = 1 << op.id
+        for member in seq:
+            used |= 1 << member.id
         for candidate in self._operations:
-            if candidate in seq or candidate == op:
+            if used >> candidate.id & 1:
                 continue
-            if candidate.method is Method.POST and candidate.path.is_ancestor_of(op.path):
+            if candidate.method is Method.POST and op.ancestors >> candidate.id & 1:
                 result.append(candidate)
         result = sorted(result, key=lambda o: len(o.path.elements))
         result.append(op)
@@ -106,16 +240,15 @@ class SCA:
     def _get_candidates(self, seq: List[Operation]):
         candidates = set()
 
-        for op in self._operations:
-            if op in seq:
-                continue
-            is_destroy = False
-            for member in seq:
-                if member.method is Method.DELETE and member.path.is_ancestor_of(op.path):
-                    is_destroy = True
-                    break
+        # operations of seq, and operations under the path of a delete in seq
+        excluded = 0
+        for member in seq:
+            excluded |= 1 << member.id
+            if member.method is Method.DELETE:
+                excluded |= member.descendants
 
-            if not is_destroy:
+        for op in self._operations:
+            if not excluded >> op.id & 1:
                 candidates.add(op)
 
         return candidates
@@ -124,10 +257,10 @@ class SCA:
         if len(candidates) == 0:
             return 0, []
 
+        candidates = list(candidates)
         results = list()
         max_count = 0
-        for c in candidates:
-            count = self._count_permutation_with_op(c, seq, c_size)
+        for c, count in zip(candidates, self._count_permutations_with_ops(candidates, seq, c_size).tolist()):
             if count == max_count:
                 results.append(c)
             elif count > max_count:
@@ -138,16 +271,72 @@ class SCA:
                 continue
         return max_count, results
 
-    def _count_permutation_with_op(self, op, seq, c_size):
-        p_list = {p + (op,) for p in combinations(seq, c_size)}
+    def _count_permutations_with_ops(self, ops, seq, c_size):
+        """for each op, the number of uncovered permutations starting with a c_size-combination of seq followed by op"""
+        prefixes = list(combinations([o.id for o in seq], c_size))
+        prefixes = np.asarray(prefixes, dtype=np.int64).reshape(len(prefixes), c_size)
+        rows = self._encode(prefixes)[:, None]
+        ids = np.asarray([o.id for o in ops], dtype=np.int64)[None, :]
         if c_size == self._strength - 1:
-            return len(self._uncovered & p_list)
+            hits = self._uncovered.contains(*np.broadcast_arrays(rows, ids))
         else:
-            count = 0
-            for uc in self._uncovered:
-                if uc[:(c_size + 1)] in p_list:
-                    count += 1
-        return count
+            # uncovered permutations starting with any of the prefixes
+            hits = self._prefix_counts[c_size + 1][rows * self._n + ids]
+        return hits.sum(axis=0)
 
     def is_all_covered(self):
-        return len(self._uncovered) == 0
+        return self._uncovered.count == 0
+
+
+class SequenceStream:
+    """
+    sequences built by SCA in a thread while the earlier ones are executed: at most size of them are queued, and the
+    shortest queued one is handed out first
+    """
+
+    def __init__(self, sca: SCA, size=16):
+        self._sca = sca
+        self._queue = queue.PriorityQueue(maxsize=size)
+        self._order = count()
+        self._stopped = threading.Event()
+        self._finished = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._produce, name="sca", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _produce(self):
+        try:
+            while not self._stopped.is_set() and not self._sca.is_all_covered():
+                seq = self._sca.build_one_sequence()
+                item = (len(seq), next(self._order), seq)
+                while not self._stopped.is_set():
+                    try:
+                        self._queue.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            self._error = e
+        finally:
+            self._finished.set()
+
+    def __iter__(self) -> Iterator[List[Operation]]:
+        while not self._stopped.is_set():
+            try:
+                _, _, seq = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                # all sequences are queued before finished is set
+                if self._finished.is_set() and self._queue.empty():
+                    break
+                continue
+            yield seq
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """stop building sequences, e.g. as the budget is spent"""
+        self._stopped.set()
+        self._thread.join()
@@ -1,4 +1,5 @@
 import csv
+import threading
 import time
 from dataclasses import dataclass
 from itertools import combinations
@@ -34,6 +35,13 @@ class Snapshot:
     op_executed_num: int = 0
     op_success_num: int = 0
     bug: int = 0
+    ca_rows_before: int = 0
+    ca_rows_after: int = 0
+    ca_num: int = 0
+    ca_fallbacks: int = 0
+    req_throttled_num: int = 0
+    outage_num: int = 0
+    outage_time: float = 0.0
 
 
 class Statistics:
@@ -48,7 +56,12 @@ class Statistics:
         self.next_pos = 0
         self.snapshot_file = Path(config.output_folder) / "snapshot.csv"
         self.report_file = Path(config.output_folder) / "report.csv"
+        self.coverage_file = Path(config.output_folder) / "coverage.csv"
+        self.latency_file = Path(config.output_folder) / "latency.csv"
         self._snapshot_list = []
+        # snapshots are taken by the thread that holds the gate of CA, the threads sending requests and the thread
+        # building sequences
+        self.lock = threading.RLock()
 
         self.seq_all_num = 0  #
         self.seq_executed_num = 0  #
@@ -61,7 +74,7 @@ class Statistics:
         self.C_2_way_executed: set = set()
         self.C_2_way_success: set = set()
         self.t_way_to_covered: int = 0  #
-        self.t_way_covered: set = set()  #
+        self.t_way_covered: int = 0  #
         self.req_num: int = 0  #
         self.req_20x_num: int = 0  #
         self.req_30x_num: int = 0  #
@@ -72,6 +85,15 @@ class Statistics:
         self.op_executed_num: set = set()  #
         self.op_success_num: set = set()  #
         self.bug: set = set()  #
+        self.ca_rows_before: int = 0  # rows of generated covering arrays, before minimization
+        self.ca_rows_after: int = 0  # rows left after minimization
+        self.ca_num: int = 0  # covering arrays generated
+        self.ca_fallbacks: int = 0  # covering arrays sampled as the generation failed or timed out
+        self.req_throttled_num: int = 0  # responses of 429 and 503 with retry-after, not counted as 40x or bugs
+        self.outage_num: int = 0  # times the SUT became unreachable
+        self.outage_time: float = 0.0  # seconds the SUT was unreachable, not spent from the budget
+        self.coverage_curves: list = list()  # (operation, is_essential, covered combinations per request, all)
+        self.latencies: list = list()  # (operation, requests, timeouts, p50, p99, timeout, demoted)
 
     def update_all_c_way(self, seq):
         self.C_1_way_all.update(self._compute_combinations(seq, 1))
@@ -85,16 +107,23 @@ class Statistics:
         self.C_1_way_success.update(self._compute_combinations(seq, 1))
         self.C_2_way_success.update(self._compute_combinations(seq, 2))
 
+    def add_coverage_curve(self, operation, is_essential, curve, total):
+        self.coverage_curves.append((operation.__repr__(), is_essential, [int(c) for c in curve], total))
+
     @staticmethod
     def _compute_combinations(seq, strength):
         covered = set()
         if len(seq) < strength:
             return covered
         for c in combinations(seq, strength):
-            covered.add(tuple(c))
+            covered.add(tuple(op.id for op in c))
         return covered
 
     def dump_snapshot(self, force=False):
+        with self.lock:
+            self._dump_snapshot(force)
+
+    def _dump_snapshot(self, force):
         pos = (time.time() - self.start) * 1.0 / self.budget
         if not force:
             if pos < self.next_pos:
@@ -118,7 +147,7 @@ class Statistics:
                             len(self.C_2_way_executed),
                             len(self.C_2_way_success),
                             self.t_way_to_covered,
-                            len(self.t_way_covered),
+                            self.t_way_covered,
                             self.req_num,
                             self.req_20x_num,
                             self.req_30x_num,
@@ -128,7 +157,14 @@ class Statistics:
                             len(self.op_num),
                             len(self.op_executed_num),
                             len(self.op_success_num),
-                            len(self.bug))
+                            len(self.bug),
+                            self.ca_rows_before,
+                            self.ca_rows_after,
+                            self.ca_num,
+                            self.ca_fallbacks,
+                            self.req_throttled_num,
+                            self.outage_num,
+                            self.outage_time)
         self._snapshot_list.append(snapshot)
 
     def write_report(self):
@@ -167,3 +203,24 @@ class Statistics:
             snapshot = self._snapshot_list[-1]
             row_data = [getattr(snapshot, field) for field in header]
             writer.writerow(row_data)
+
+        if len(self.coverage_curves) > 0:
+            is_new = not self.coverage_file.exists()
+            with self.coverage_file.open("a+") as fp:
+                writer = csv.writer(fp, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+                if is_new:
+                    writer.writerow(["name", "operation", "essential", "request", "covered", "all"])
+                for operation, is_essential, curve, total in self.coverage_curves:
+                    for request, covered in enumerate(curve):
+                        writer.writerow([self.name, operation, is_essential, request + 1, covered, total])
+
+        if len(self.latencies) > 0:
+            is_new = not self.latency_file.exists()
+            with self.latency_file.open("a+") as fp:
+                writer = csv.writer(fp, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+                if is_new:
+                    writer.writerow(["name", "operation", "requests", "timeouts", "p50", "p99", "timeout", "demoted"])
+                for operation, requests, timeouts, p50, p99, timeout, demoted in self.latencies:
+                    writer.writerow([self.name, operation, requests, timeouts,
+                                     "" if p50 is None else round(p50, 4), "" if p99 is None else round(p99, 4),
+                                     round(timeout, 4), demoted])
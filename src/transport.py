@@ -0,0 +1,310 @@
+import json
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from http.cookiejar import CookiePolicy
+from typing import Tuple, Dict, Optional, Callable, Union
+from urllib.parse import urlparse
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from src.Dto.body import ResponseBody
+
+try:
+    import orjson
+except ImportError:
+    # optional, bodies are encoded by the json module without it
+    orjson = None
+
+
+class Auth:
+    def __init__(self, headerAuth, queryAuth):
+        self.headerAuth = headerAuth
+        self.queryAuth = queryAuth
+
+    def __call__(self, r):
+        for key, token in self.headerAuth.items():
+            r.headers[key] = token
+        if len(self.queryAuth) > 0:
+            # a prepared request has no params any more, the tokens are appended to its url
+            r.prepare_url(r.url, self.queryAuth)
+        return r
+
+
+def jsonBody(value) -> Union[str, bytes]:
+    """json body of a request, utf-8 bytes encoded by orjson if it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            # e.g. integers beyond 64 bits
+            pass
+    return json.dumps(value)
+
+
+def is_throttled(response: requests.Response) -> bool:
+    """429, or a 503 asking to retry later: the SUT throttles us. other 503 are server errors"""
+    return response.status_code == 429 or (response.status_code == 503 and "Retry-After" in response.headers)
+
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    """seconds asked by the Retry-After header, either delay-seconds or an http date"""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    token bucket whose rate adapts AIMD-style: it is multiplied by decrease when the SUT throttles us
+    (and no token is given before Retry-After), and grows by about increase per second while responses are healthy,
+    up to ceiling requests per second
+    """
+
+    def __init__(self, ceiling, floor=0.5, increase=1.0, decrease=0.5):
+        self.ceiling = ceiling
+        self.floor = min(floor, ceiling)
+        self.rate = ceiling
+        self._increase = increase
+        self._decrease = decrease
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.throttles = 0
+        self.waited = 0.0
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._last:
+                    # at most one second of tokens is saved up
+                    self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._last) * self.rate)
+                    self._last = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    wait = self._last - now
+                self.waited += wait
+            time.sleep(wait)
+
+    def throttled(self, delay: Optional[float] = None):
+        with self._lock:
+            self.throttles += 1
+            self.rate = max(self.floor, self.rate * self._decrease)
+            self._tokens = 0.0
+            if delay is not None:
+                self._last = max(self._last, time.monotonic() + delay)
+
+    def succeeded(self):
+        with self._lock:
+            self.rate = min(self.ceiling, self.rate + self._increase / max(self.rate, 1.0))
+
+
+class CircuitBreaker:
+    """
+    opened after threshold consecutive requests do not reach the SUT (connection errors and timeouts).
+    while it is open requests wait, and one of them probes the SUT with exponential backoff until it responds.
+    the breaker gives up if one outage lasts longer than max_outage seconds
+    """
+
+    def __init__(self, probe: Callable[[str], bool], threshold=5, backoff=1.0, max_backoff=60.0, max_outage=600.0,
+                 listener: Callable[[bool, float], None] = None):
+        self._probe = probe
+        # never opened if 0
+        self._threshold = threshold
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._max_outage = max_outage
+        # called with (True, 0) when an outage starts and (False, its seconds) when it ends
+        self._listener = listener
+
+        self._cond = threading.Condition()
+        self._failures = 0
+        self._url = None
+        self._opened: Optional[float] = None
+        self._probing = False
+
+        self.outages = 0
+        self.outage_time = 0.0
+        self.dead = False
+
+    def outage(self) -> float:
+        """seconds the SUT has been unreachable, including the current outage"""
+        with self._cond:
+            current = 0.0 if self._opened is None else time.monotonic() - self._opened
+            return self.outage_time + current
+
+    def failed(self, url):
+        with self._cond:
+            self._failures += 1
+            if self._threshold <= 0 or self._failures < self._threshold or self._opened is not None or self.dead:
+                return
+            self._opened = time.monotonic()
+            self._url = url
+            self.outages += 1
+        logger.warning("{} requests in a row did not reach the SUT, testing is paused", self._failures)
+        if self._listener is not None:
+            self._listener(True, 0.0)
+
+    def succeeded(self):
+        with self._cond:
+            self._failures = 0
+
+    def wait(self) -> bool:
+        """block while the breaker is open, False if the SUT is given up"""
+        with self._cond:
+            while self._opened is not None and self._probing:
+                self._cond.wait()
+            if self._opened is None:
+                return not self.dead
+            self._probing = True
+            opened, url = self._opened, self._url
+
+        delay = self._backoff
+        alive = False
+        while not alive:
+            remaining = self._max_outage - (time.monotonic() - opened)
+            if remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            alive = self._probe(url)
+            delay = min(self._max_backoff, delay * 2)
+
+        with self._cond:
+            seconds = time.monotonic() - opened
+            self.outage_time += seconds
+            self._opened = None
+            self._probing = False
+            self._failures = 0
+            self.dead = not alive
+            self._cond.notify_all()
+        if alive:
+            logger.info("the SUT is back after {:.1f}s, testing is resumed", seconds)
+        else:
+            logger.error("the SUT has been unreachable for {:.1f}s, testing is stopped", seconds)
+        if self._listener is not None:
+            self._listener(False, seconds)
+        return alive
+
+
+class _NoCookies(CookiePolicy):
+    netscape = True
+    rfc2965 = False
+    hide_cookie2 = False
+
+    def set_ok(self, cookie, request):
+        return False
+
+    def return_ok(self, cookie, request):
+        return False
+
+    def domain_return_ok(self, domain, request):
+        return False
+
+    def path_return_ok(self, path, request):
+        return False
+
+
+class Transport:
+    """
+    one requests.Session shared by all the requests sent to the SUT: tcp (and tls) connections are kept alive
+    and reused, up to pool_size connections per host, and the auth is attached to the session once
+    """
+
+    def __init__(self, queryAuth=None, headerAuth=None, pool_size=10, timeout=50, per_host=0, rate_limit=0):
+        self._session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("http://", self._adapter)
+        self._session.mount("https://", self._adapter)
+        # every request used to be sent on its own, cookies set by the SUT are not sent back
+        self._session.cookies.set_policy(_NoCookies())
+        queryAuth = dict() if queryAuth is None else queryAuth
+        headerAuth = dict() if headerAuth is None else headerAuth
+        if len(queryAuth) > 0 or len(headerAuth) > 0:
+            self._session.auth = Auth(headerAuth, queryAuth)
+        self._timeout = timeout
+
+        # requests sent to one host at the same time, unlimited if 0
+        self._per_host = per_host
+        self._slots: Dict[str, threading.BoundedSemaphore] = dict()
+        self._lock = threading.Lock()
+
+        # requests per second, unlimited if 0
+        self.limiter = RateLimiter(rate_limit) if rate_limit > 0 else None
+
+    def _slot(self, url) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self._per_host)
+            return self._slots[host]
+
+    def request(self, method: str, timeout=None, **kwargs) -> requests.Response:
+        timeout = self._timeout if timeout is None else timeout
+        if self.limiter is not None:
+            self.limiter.acquire()
+        if self._per_host <= 0:
+            response = self._session.request(method.upper(), timeout=timeout, **kwargs)
+        else:
+            with self._slot(kwargs.get("url")):
+                response = self._session.request(method.upper(), timeout=timeout, **kwargs)
+        if self.limiter is not None:
+            if is_throttled(response):
+                self.limiter.throttled(retry_after(response))
+            else:
+                self.limiter.succeeded()
+        return response
+
+    @staticmethod
+    def read(response: requests.Response, limit=0) -> ResponseBody:
+        """
+        the body of a response sent with stream=True, at most limit bytes (unlimited if 0).
+        the connection of a truncated response is closed instead of reading the rest
+        """
+        if limit <= 0:
+            return ResponseBody(response.content, response.encoding)
+        chunks, size = list(), 0
+        for chunk in response.iter_content(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > limit:
+                response.close()
+                return ResponseBody(b"".join(chunks)[:limit], response.encoding, truncated=True)
+        return ResponseBody(b"".join(chunks), response.encoding)
+
+    def probe(self, url) -> bool:
+        """whether the host of url answers at all, whatever the status code"""
+        parsed = urlparse(url)
+        try:
+            self._session.head("{}://{}/".format(parsed.scheme, parsed.netloc), timeout=min(self._timeout, 5))
+        except requests.exceptions.RequestException:
+            return False
+        return True
+
+    def connection_counts(self) -> Tuple[int, int]:
+        """requests sent and connections opened by the pools of all hosts"""
+        sent, opened = 0, 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                sent += pool.num_requests
+                opened += pool.num_connections
+        return sent, opened
+
+    def close(self):
+        self._session.close()